@@ -1,16 +1,26 @@
 import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import re
 import subprocess
 import sys
 from pathlib import Path
 
-# Make the local package importable without installation.
 ROOT = Path(__file__).resolve().parent
-sys.path.insert(0, str(ROOT / "src"))
 
-from graphrender import GraphRender
+# Prefer an installed graphrender (pip install -e . gives it a canonical
+# import location); only fall back to the source checkout's src/ layout.
+if importlib.util.find_spec("graphrender") is None:
+    sys.path.insert(0, str(ROOT / "src"))
+
+# Bound on first use inside main() so `--help` and argument errors exit
+# without paying the renderer (and svg.py) import cost.
+GraphRender = None
 
 def load_theme_css(theme_path: Path) -> str:
-    """Load CSS directly or compile SCSS/SASS to CSS via the `sass` CLI."""
+    """Load CSS directly or compile SCSS/SASS to CSS."""
     suffix = theme_path.suffix.lower()
     if suffix == ".css":
         return theme_path.read_text(encoding="utf-8")
@@ -18,21 +28,264 @@ def load_theme_css(theme_path: Path) -> str:
         raise ValueError(
             f"Unsupported theme extension '{theme_path.suffix}'. Use .css, .scss, or .sass."
         )
+    return _compile_scss(theme_path)
+
+
+# One @import/@use statement can name several comma-separated targets;
+# capture the whole clause and pull the quoted names out separately.
+SCSS_IMPORT_PATTERN = re.compile(r"@(?:import|use)\s+([^;]+)")
+_SCSS_IMPORT_TARGET = re.compile(r"""['"]([^'"]+)['"]""")
+
+
+def _resolve_theme_cache_dir() -> Path | None:
+    """
+    Resolve the persistent compiled-theme cache directory.
+
+    Override with GRAPHRENDER_THEME_CACHE_DIR. Set GRAPHRENDER_THEME_CACHE_DIR
+    to an empty string to disable disk caching.
+    """
+    raw = os.environ.get("GRAPHRENDER_THEME_CACHE_DIR")
+    if raw is not None:
+        raw = raw.strip()
+        if not raw:
+            return None
+        return Path(raw).expanduser()
+
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache).expanduser() / "graphrender" / "themes"
+
+    local_appdata = os.environ.get("LOCALAPPDATA")
+    if local_appdata:
+        return Path(local_appdata).expanduser() / "graphrender" / "themes"
+
+    return Path.home() / ".cache" / "graphrender" / "themes"
+
+
+def _resolve_scss_import(base_dir: Path, target: str) -> Path | None:
+    """Resolve an @import/@use target to a file next to the importer."""
+    relative = Path(target)
+    candidates = [
+        relative,
+        relative.with_name(f"{relative.name}.scss"),
+        relative.with_name(f"{relative.name}.sass"),
+        relative.with_name(f"_{relative.name}.scss"),
+        relative.with_name(f"_{relative.name}.sass"),
+        relative.with_name(f"{relative.name}.css"),
+        # `@use 'dir'` loads the directory's index file.
+        relative / "_index.scss",
+        relative / "index.scss",
+    ]
+    for candidate in candidates:
+        path = base_dir / candidate
+        if path.is_file():
+            return path
+    return None
+
+
+def _scss_dependencies(theme_path: Path) -> list[Path]:
+    """Return the theme file plus its transitive @import/@use dependencies."""
+    ordered: list[Path] = []
+    seen: set[Path] = set()
+    stack = [theme_path]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        ordered.append(current)
+        try:
+            text = current.read_text(encoding="utf-8")
+        except OSError:
+            continue
+        for clause in SCSS_IMPORT_PATTERN.findall(text):
+            for target in _SCSS_IMPORT_TARGET.findall(clause):
+                resolved = _resolve_scss_import(current.parent, target)
+                if resolved is not None:
+                    stack.append(resolved)
+    return ordered
+
+
+def _theme_cache_key(deps: list[Path]) -> str:
+    """Content hash over the theme file and all of its dependencies."""
+    digest = hashlib.blake2b(digest_size=16)
+    for dep in deps:
+        try:
+            digest.update(dep.read_bytes())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def _store_theme_css_to_disk(cache_path: Path, css: str) -> None:
+    """Persist compiled CSS atomically (best effort)."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        tmp_path.write_text(css, encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
+
+
+def _theme_manifest_path(cache_dir: Path) -> Path:
+    return cache_dir / "theme.manifest"
+
+
+def _load_theme_manifest(cache_dir: Path) -> dict:
+    """Read the theme manifest mapping theme path -> cache key + dep mtimes."""
+    try:
+        return json.loads(_theme_manifest_path(cache_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_theme_manifest(cache_dir: Path, manifest: dict) -> None:
+    """Persist the theme manifest atomically (best effort)."""
+    _store_theme_css_to_disk(_theme_manifest_path(cache_dir), json.dumps(manifest))
+
+
+def _dep_mtimes_unchanged(recorded: list) -> bool:
+    """Return True when every recorded (path, mtime_ns) pair still matches."""
+    if not recorded:
+        return False
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in recorded)
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+# Session-level memo of compiled themes keyed by dependency mtimes. Repeat
+# compiles within one process skip both hashing and the compiler entirely.
+_SCSS_MEMO: dict[tuple[tuple[str, int], ...], str] = {}
+
+
+def _theme_mtime_key(deps: list[Path]) -> tuple[tuple[str, int], ...] | None:
+    """Build a memo key from dependency paths and mtimes (None on stat error)."""
+    try:
+        return tuple((str(dep), os.stat(dep).st_mtime_ns) for dep in deps)
+    except OSError:
+        return None
+
+
+def _compile_scss(theme_path: Path) -> str:
+    """
+    Compile an SCSS/SASS theme, consulting the in-process memo and the
+    on-disk cache first.
+
+    Compiled CSS is cached keyed by a content hash of the theme file and its
+    @import/@use dependencies, so unchanged themes skip compilation entirely.
+    """
+    cache_dir = _resolve_theme_cache_dir()
+    if cache_dir is None:
+        return _theme_compiler(theme_path)
+
+    # Fast path: the manifest records the dependency set and mtimes from the
+    # last compile, so an unchanged theme costs a few stats — no reading or
+    # hashing of theme contents at all.
+    manifest = _load_theme_manifest(cache_dir)
+    entry = manifest.get(str(theme_path))
+    if entry and _dep_mtimes_unchanged(entry.get("deps") or []):
+        memo_key = tuple((path, mtime) for path, mtime in entry["deps"])
+        if memo_key in _SCSS_MEMO:
+            return _SCSS_MEMO[memo_key]
+        try:
+            css = (cache_dir / f"{entry['key']}.css").read_text(encoding="utf-8")
+            _SCSS_MEMO[memo_key] = css
+            return css
+        except (KeyError, OSError):
+            pass
+
+    deps = _scss_dependencies(theme_path)
+    memo_key = _theme_mtime_key(deps)
+    if memo_key is not None and memo_key in _SCSS_MEMO:
+        return _SCSS_MEMO[memo_key]
+
+    cache_key = _theme_cache_key(deps)
+    cache_path = cache_dir / f"{cache_key}.css"
+    css = None
+    try:
+        if cache_path.exists():
+            css = cache_path.read_text(encoding="utf-8")
+    except OSError:
+        css = None
+
+    if css is None:
+        css = _theme_compiler(theme_path)
+        _store_theme_css_to_disk(cache_path, css)
+
+    if memo_key is not None:
+        _SCSS_MEMO[memo_key] = css
+        manifest[str(theme_path)] = {
+            "key": cache_key,
+            "deps": [[path, mtime] for path, mtime in memo_key],
+        }
+        _store_theme_manifest(cache_dir, manifest)
+    return css
+
+
+def _compile_scss_uncached(theme_path: Path) -> str:
+    """
+    Compile an SCSS/SASS theme to CSS.
+
+    Prefers the in-process `libsass` binding (no subprocess startup cost);
+    falls back to the Dart `sass` CLI when the binding is not installed.
+    """
+    try:
+        import sass
+    except ImportError:
+        return _compile_scss_cli(theme_path)
+
+    try:
+        # No output_style override: libsass defaults to expanded CSS, which
+        # matches what the sass CLI fallback emits.
+        return sass.compile(
+            filename=str(theme_path),
+            source_map_embed=False,
+            include_paths=[str(theme_path.parent)],
+        )
+    except sass.CompileError as exc:
+        raise RuntimeError(f"sass compilation failed:\n{exc}") from exc
+
+
+# Compiler seam: every cache miss in _compile_scss goes through this
+# callable, so tests (and embedders with their own compiler) can swap it
+# without touching subprocess or sass internals.
+_theme_compiler = _compile_scss_uncached
+
+
+def _compile_scss_cli(theme_path: Path) -> str:
+    """Compile SCSS/SASS via the `sass` CLI subprocess (libsass fallback)."""
     try:
-        proc = subprocess.run(
+        proc = subprocess.Popen(
             ["sass", "--no-source-map", str(theme_path)],
             cwd=str(theme_path.parent),
-            capture_output=True,
-            text=True,
-            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=1 << 20,
         )
     except FileNotFoundError as exc:
         raise RuntimeError(
             "SCSS/SASS theme compilation requires the `sass` CLI in PATH."
         ) from exc
+    out, err = proc.communicate()
     if proc.returncode != 0:
-        raise RuntimeError(f"sass compilation failed:\n{proc.stderr.strip()}")
-    return proc.stdout
+        raise RuntimeError(
+            f"sass compilation failed:\n{err.decode('utf-8', errors='replace').strip()}"
+        )
+    return out.decode("utf-8")
+
+
+def _resolve_existing(arg: str, *, missing_message: str) -> Path:
+    """Resolve a CLI path against ROOT and verify existence with one stat."""
+    path = Path(arg)
+    if not path.is_absolute():
+        path = ROOT / path
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"{missing_message}: {path}") from None
+    return path
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -57,12 +310,14 @@ def main(argv: list[str] | None = None) -> None:
         action="store_true",
         help="Disable embedding theme CSS into the SVG.",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact SVG output (skip pretty-printing).",
+    )
     args = parser.parse_args(argv)
 
-    input_arg = Path(args.input)
-    input_path = input_arg if input_arg.is_absolute() else (ROOT / input_arg)
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input JSON not found: {input_path}")
+    input_path = _resolve_existing(args.input, missing_message="Input JSON not found")
     output_path = (
         Path(args.output)
         if args.output
@@ -73,18 +328,19 @@ def main(argv: list[str] | None = None) -> None:
 
     theme_css = None
     if args.theme:
-        theme_arg = Path(args.theme)
-        theme_path = theme_arg if theme_arg.is_absolute() else (ROOT / theme_arg)
-        if not theme_path.exists():
-            raise FileNotFoundError(f"Theme file not found: {theme_path}")
+        theme_path = _resolve_existing(args.theme, missing_message="Theme file not found")
         theme_css = load_theme_css(theme_path)
 
+    global GraphRender
+    if GraphRender is None:
+        from graphrender import GraphRender
+
     graph = GraphRender.from_file(
         input_path,
         embed_theme=not args.no_theme,
         theme_css=theme_css,
     )
-    graph.write(output_path)
+    graph.write(output_path, pretty=not args.compact)
     print(f"Rendered: {output_path}")
 
 if __name__ == "__main__":
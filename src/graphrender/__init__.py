@@ -1,17 +1,22 @@
 """
 GraphRender package initialization.
 Exports the GraphRender converter and resource helpers.
+
+Submodules are imported lazily (PEP 562) so that single-purpose callers —
+e.g. the CLI parsing arguments or a profile-only consumer — do not pay the
+import cost of modules they never touch.
 """
 
-from .graphrender import GraphRender
+from importlib import import_module
 
-from .resources import default_theme_css
-from .profile import (
-    ResolvedProfileRenderBundle,
-    css_class_token,
-    render_kwargs_from_profile_bundle,
-    resolve_profile_render_bundle,
-)
+_LAZY_EXPORTS = {
+    "GraphRender": ".graphrender",
+    "default_theme_css": ".resources",
+    "ResolvedProfileRenderBundle": ".profile",
+    "css_class_token": ".profile",
+    "resolve_profile_render_bundle": ".profile",
+    "render_kwargs_from_profile_bundle": ".profile",
+}
 
 __all__ = [
     "GraphRender",
@@ -21,3 +26,17 @@ __all__ = [
     "resolve_profile_render_bundle",
     "render_kwargs_from_profile_bundle",
 ]
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
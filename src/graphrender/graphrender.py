@@ -17,8 +17,11 @@ import json
 import os
 import re
 import xml.etree.ElementTree as ET
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, TextIO, Tuple
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 from .resources import default_theme_css
@@ -26,9 +29,155 @@ from .profile import css_class_token
 
 import svg
 
+try:  # Optional C-backed JSON parser; stdlib json remains the fallback.
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+try:  # Optional vectorized geometry; the scalar path remains the fallback.
+    import numpy as _np
+except ImportError:
+    _np = None
+
 Number = float | int
 Point = Tuple[Number, Number]
 
+# Boundary between two adjacent tags in serialized SVG; whitespace-only
+# gaps carry no meaning and become the line breaks of the pretty output.
+_ADJACENT_TAGS = re.compile(r">\s*<")
+# A non-self-closing <style> opener; its CSS body moves to its own lines.
+_STYLE_OPEN = re.compile(r"(<style\b[^>]*(?<!/)>)")
+
+# Icon-name sanitization: ASCII names go through a precomputed translate
+# table; the compiled regex remains the fallback for non-ASCII input.
+_ICON_ID_INVALID = re.compile(r"[^a-zA-Z0-9_-]")
+_ID_SANITIZE_TABLE = {
+    i: "-" for i in range(128) if not (chr(i).isalnum() or chr(i) in "_-")
+}
+
+
+def _fmt(value: Number) -> str:
+    """Format an emitted coordinate to two decimals; SVG needs no more."""
+    return f"{value:.2f}"
+
+
+def _sanitize_icon_token(icon_name: str) -> str:
+    """Replace characters unfit for an XML id or filename with dashes."""
+    if icon_name.isascii():
+        safe = icon_name.translate(_ID_SANITIZE_TABLE)
+    else:
+        safe = _ICON_ID_INVALID.sub("-", icon_name)
+    return safe.strip("-_")
+
+
+# name="value" pairs within a single opening tag; enough for reading
+# viewBox/width/height off an icon's root without building a parse tree.
+_SVG_ATTR = re.compile(r'([A-Za-z_:][-A-Za-z0-9_:.]*)\s*=\s*["\']([^"\']*)["\']')
+
+
+def _svg_root_attrs(svg_text: str) -> Optional[Dict[str, str]]:
+    """Extract the root <svg> tag's attributes, or None if no tag is found."""
+    start = svg_text.find("<svg")
+    if start == -1:
+        return None
+    end = svg_text.find(">", start)
+    if end == -1:
+        return None
+    return dict(_SVG_ATTR.findall(svg_text, start, end))
+
+# Resolve optional svg.py classes once at import; a failed probe leaves the
+# module-level fallback classes below in charge.
+_SVG_RAW = getattr(svg, "Raw", None)
+try:
+    if _SVG_RAW is not None:
+        _SVG_RAW("")
+except Exception:
+    _SVG_RAW = None
+
+_SVG_STYLE = getattr(svg, "Style", None)
+try:
+    if _SVG_STYLE is not None:
+        _SVG_STYLE(content="")
+except Exception:
+    _SVG_STYLE = None
+
+
+class _InlineRaw:
+    """Fallback raw-SVG fragment for svg.py versions without Raw."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, raw_text: str) -> None:
+        self.text = raw_text
+
+    def as_str(self) -> str:
+        return self.text
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class _InlineStyle:
+    """Fallback <style> element for svg.py versions without Style."""
+
+    __slots__ = ("css",)
+
+    def __init__(self, css: str) -> None:
+        self.css = css
+
+    def as_str(self) -> str:
+        return f"<style>{self.css}</style>"
+
+    def __str__(self) -> str:  # svg.py may fall back to str()
+        return self.as_str()
+
+
+@dataclass(slots=True)
+class _Label:
+    """A collected label in root coordinates; slots keep 10k-label graphs lean."""
+
+    owner_kind: str
+    owner: str
+    id: Optional[str]
+    text: str
+    x: Number
+    y: Number
+    width: Number
+    height: Number
+    font_size: Optional[Number]
+
+
+class _EdgeRender(NamedTuple):
+    """Per-edge-type SVG styling: markers and dash pattern."""
+
+    marker_start: Optional[str]
+    marker_end: Optional[str]
+    stroke_dasharray: Optional[str]
+
+
+# Defaults preserve backward compatibility (filled arrow at the target).
+_DEFAULT_RENDER = _EdgeRender(None, "url(#arrow)", None)
+
+# text-anchor per port side; sides not in the map center their labels.
+_SIDE_ANCHOR = {"WEST": "end", "EAST": "start"}
+
+_EDGE_TYPE_RENDER: Dict[str, _EdgeRender] = {
+    "NONE": _EdgeRender(None, None, None),
+    "UNDIRECTED": _EdgeRender(None, None, None),
+    "DIRECTED": _EdgeRender(None, "url(#arrow)", None),
+    "ASSOCIATION": _EdgeRender(None, "url(#arrow-open)", None),
+    "DEPENDENCY": _EdgeRender(None, "url(#arrow-open-dependency)", "6 3"),
+    "GENERALIZATION": _EdgeRender(None, "url(#triangle-hollow)", None),
+}
+
+
+def _json_loads(data: str | bytes) -> Dict:
+    """Parse JSON with orjson when available, stdlib json otherwise."""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
 ET.register_namespace("", "http://www.w3.org/2000/svg")
 ICONIFY_NAME_PATTERN = re.compile(
     r"^[a-z0-9]+(?:-[a-z0-9]+)*:[a-z0-9]+(?:[-_][a-z0-9]+)*$"
@@ -49,8 +198,21 @@ class GraphRender:
         font_size: Number = 12,
         embed_theme: bool = True,
         theme_css: Optional[str] = None,
+        enable_icon_prefetch: bool = True,
+        emit_raw_shapes: bool = True,
+        group_edges: bool = True,
+        show_bend_points: bool = False,
     ) -> None:
         self.graph = graph
+        # Raw mode emits pre-formatted SVG fragments for shapes instead of
+        # svg.py objects; svg.G serializes embedded strings verbatim.
+        self._emit_raw = emit_raw_shapes
+        # group_edges=False batches same-style sections into shared <path>
+        # elements instead of one wrapper + polyline per edge.
+        self._group_edges = group_edges
+        # Debug circles at bend points; pure element-count overhead unless
+        # someone is inspecting the routing.
+        self.show_bend_points = show_bend_points
         self.padding = padding
         self.font_size = font_size
         self.embed_theme = embed_theme
@@ -78,27 +240,67 @@ class GraphRender:
         if edge_style:
             self.edge_style.update(edge_style)
 
+        # Styles are fixed from here on; bake the per-shape constant attribute
+        # tails once so the hot loops skip the dict lookups and formatting.
+        rx = self.node_style.get("rx")
+        rx_attr = f' rx="{rx}"' if rx is not None else ""
+        self._node_rect_attrs = (
+            f'fill="{self.node_style["fill"]}" '
+            f'stroke="{self.node_style["stroke"]}"{rx_attr}'
+        )
+        self._port_rect_attrs = (
+            f'fill="{self.port_style["fill"]}" '
+            f'stroke="{self.port_style["stroke"]}"'
+        )
+
         # Internal collections filled by _collect_graph.
         self.nodes: List[Dict] = []
         self.edges: List[Dict] = []
-        self.labels: List[Dict] = []
+        self.labels: List[_Label] = []
         self.port_lookup: Dict[str, Dict] = {}
         self.node_lookup: Dict[str, Dict] = {}
         self._icon_cache: Dict[str, Optional[str]] = {}
         self._icon_geom_cache: Dict[str, Optional[Tuple[str, float, float]]] = {}
         self._icon_def_ids: Dict[str, str] = {}
+        # Scale/centering transform tails per (icon, node size); only the
+        # outer translate differs between equally sized nodes.
+        self._icon_transform_cache: Dict[Tuple[str, Number, Number], str] = {}
+        self._icon_def_id_set: set[str] = set()
+        # Option lookups keyed by id(); each entry keeps the item alive so
+        # the key can never be recycled for a different dict.
+        self._font_size_memo: Dict[int, Tuple[Dict, Optional[Number]]] = {}
+        self._thickness_memo: Dict[int, Tuple[Dict, Optional[Number]]] = {}
         self._defs_cache: Optional[svg.Defs] = None
+        self._canvas_size_cache: Optional[Tuple[Number, Number]] = None
         self._icon_cache_dir: Optional[Path] = self._resolve_icon_cache_dir()
 
         self._collect_graph(self.graph, offset=(0, 0))
+        self._assign_port_sides()
+        # Port centers and label anchors are fixed once sides are assigned;
+        # resolve both in a single pass over the ports.
+        self.port_center_lookup: Dict[str, Point] = {}
+        for pid, port in self.port_lookup.items():
+            self.port_center_lookup[pid] = (
+                port["x"] + port.get("width", 0) / 2,
+                port["y"] + port.get("height", 0) / 2,
+            )
+            port["anchor"] = _SIDE_ANCHOR.get(port["side"], "middle")
+        self._owner_kind = self._build_owner_kind_index()
+        if enable_icon_prefetch:
+            self._prefetch_icons()
 
     # ------------------------------------------------------------------ #
     # Helpers
     # ------------------------------------------------------------------ #
     def _option_value(self, item: Dict, *keys: str) -> Optional[object]:
         """Read an ELK option from layoutOptions/properties with stable precedence."""
-        opts = item.get("layoutOptions") or {}
-        props = item.get("properties") or {}
+        opts = item.get("layoutOptions")
+        props = item.get("properties")
+        if not opts and not props:
+            # The common case: most ELK items carry no options at all.
+            return None
+        opts = opts or {}
+        props = props or {}
         for key in keys:
             if key in opts:
                 return opts[key]
@@ -108,18 +310,26 @@ class GraphRender:
 
     def _font_size(self, item: Dict) -> Optional[Number]:
         """Extract an optional font size from ELK options/properties."""
+        entry = self._font_size_memo.get(id(item))
+        if entry is not None and entry[0] is item:
+            return entry[1]
+
         value = self._option_value(
             item,
             "org.eclipse.elk.font.size",
             "elk.font.size",
             "font.size",
         )
-        if value is None:
-            return None
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return None
+        result: Optional[Number] = None
+        if value is not None:
+            try:
+                result = float(value)
+            except (TypeError, ValueError):
+                result = None
+        # Keeping the item in the memo pins its id() for the instance
+        # lifetime, so the identity check above cannot alias a new dict.
+        self._font_size_memo[id(item)] = (item, result)
+        return result
 
     def _port_side(
         self,
@@ -150,65 +360,129 @@ class GraphRender:
         }
         return min(distances, key=distances.get)
 
+    def _assign_port_sides(self) -> None:
+        """
+        Assign WEST/EAST/NORTH/SOUTH to every collected port in one batch.
+
+        With NumPy available, all side distances are computed in a single
+        (N, 4) argmin pass; otherwise each port falls back to the scalar
+        `_port_side` computation.
+        """
+        ports = list(self.port_lookup.values())
+        if not ports:
+            return
+
+        if _np is not None:
+            try:
+                count = len(ports)
+                cx = _np.fromiter(
+                    (float(p["x"]) + float(p.get("width", 0)) / 2 for p in ports),
+                    dtype=float,
+                    count=count,
+                )
+                cy = _np.fromiter(
+                    (float(p["y"]) + float(p.get("height", 0)) / 2 for p in ports),
+                    dtype=float,
+                    count=count,
+                )
+                owners = [self.node_lookup.get(p["owner"]) or {} for p in ports]
+                nx = _np.fromiter((float(n.get("x", 0)) for n in owners), dtype=float, count=count)
+                ny = _np.fromiter((float(n.get("y", 0)) for n in owners), dtype=float, count=count)
+                nw = _np.fromiter((float(n.get("width", 0)) for n in owners), dtype=float, count=count)
+                nh = _np.fromiter((float(n.get("height", 0)) for n in owners), dtype=float, count=count)
+            except (TypeError, ValueError):
+                pass  # Non-numeric geometry: fall through to the scalar path.
+            else:
+                distances = _np.stack(
+                    [
+                        _np.abs(cx - nx),
+                        _np.abs(cx - (nx + nw)),
+                        _np.abs(cy - ny),
+                        _np.abs(cy - (ny + nh)),
+                    ],
+                    axis=1,
+                )
+                side_names = ("WEST", "EAST", "NORTH", "SOUTH")
+                for port, side_idx in zip(ports, distances.argmin(axis=1)):
+                    port["side"] = side_names[side_idx]
+                return
+
+        for port in ports:
+            owner = self.node_lookup.get(port["owner"]) or {}
+            port["side"] = self._port_side(
+                owner,
+                port["raw"],
+                port_abs_x=port["x"],
+                port_abs_y=port["y"],
+            )
+
+    def _build_owner_kind_index(self) -> Dict[str, str]:
+        """
+        Map each collected owner id to its kind, once.
+
+        Later insertions win on overlapping ids, so edges are added last to
+        preserve the edge > port > node precedence the label partitioning
+        relied on when it re-scanned the lookups per label.
+        """
+        owner_kind: Dict[str, str] = dict.fromkeys(self.node_lookup, "node")
+        owner_kind.update(dict.fromkeys(self.port_lookup, "port"))
+        for entry in self.edges:
+            edge_id = (entry.get("edge") or {}).get("id")
+            if edge_id is not None:
+                owner_kind[edge_id] = "edge"
+        return owner_kind
+
     def _label_text_anchor(
         self,
         owner: Optional[str],
         owner_kind: Optional[str] = None,
     ) -> str:
         """Determine text-anchor. Port labels are side-aware, others stay centered."""
-        if owner_kind is None and owner and owner in self.port_lookup:
+        if owner_kind is None and owner and self._owner_kind.get(owner) == "port":
             owner_kind = "port"
-        if owner_kind == "port" and owner and owner in self.port_lookup:
-            side = self.port_lookup[owner].get("side")
-            if side == "WEST":
-                return "end"
-            if side == "EAST":
-                return "start"
+        if owner_kind == "port" and owner:
+            port = self.port_lookup.get(owner)
+            if port is not None:
+                return port.get("anchor") or "middle"
         return "middle"
 
-    def _partition_labels(self) -> Dict[str, Dict[str, List[Dict]]]:
-        """Group labels by their owner type for structured rendering."""
-        node_labels: Dict[str, List[Dict]] = {}
-        port_labels: Dict[str, List[Dict]] = {}
-        edge_labels: Dict[str, List[Dict]] = {}
-        edge_owner_ids = {
-            edge.get("id")
-            for entry in self.edges
-            for edge in [entry.get("edge") or {}]
-            if edge.get("id") is not None
+    def _partition_labels(
+        self,
+    ) -> Tuple[Dict[str, Dict[str, List[_Label]]], set]:
+        """
+        Group labels by their owner type for structured rendering.
+
+        Also returns the set of owners with non-empty label text, collected
+        in the same pass so the nodes builder never rescans all labels just
+        to decide on fallback text.
+        """
+        if not self.labels:
+            return {"node": {}, "port": {}, "edge": {}}, set()
+
+        grouped: Dict[str, Dict[str, List[_Label]]] = {
+            "node": defaultdict(list),
+            "port": defaultdict(list),
+            "edge": defaultdict(list),
         }
+        owners_with_text: set = set()
+        owner_kinds = self._owner_kind
 
         for lbl in self.labels:
-            owner = lbl.get("owner")
-            owner_kind = lbl.get("owner_kind")
-            if owner_kind == "node":
-                node_labels.setdefault(owner or "", []).append(lbl)
-                continue
-            if owner_kind == "port":
-                port_labels.setdefault(owner or "", []).append(lbl)
-                continue
-            if owner_kind == "edge":
-                edge_labels.setdefault(owner or "", []).append(lbl)
-                continue
-
-            # Edge labels take precedence when ids overlap with node/port ids.
-            if owner in edge_owner_ids:
-                edge_labels.setdefault(owner, []).append(lbl)
-            elif owner in self.port_lookup:
-                port_labels.setdefault(owner, []).append(lbl)
-            elif owner in self.node_lookup:
-                node_labels.setdefault(owner, []).append(lbl)
-            else:
-                edge_labels.setdefault(owner or "", []).append(lbl)
+            # Unknown owners land with the edges, matching the precedence
+            # edges already have on overlapping ids.
+            kind = lbl.owner_kind or owner_kinds.get(lbl.owner, "edge")
+            grouped[kind][lbl.owner or ""].append(lbl)
+            if lbl.text:
+                owners_with_text.add(lbl.owner)
 
-        return {
-            "node": node_labels,
-            "port": port_labels,
-            "edge": edge_labels,
-        }
+        return grouped, owners_with_text
 
     def _edge_thickness(self, edge: Dict) -> Optional[Number]:
         """Extract an optional stroke width for an edge."""
+        entry = self._thickness_memo.get(id(edge))
+        if entry is not None and entry[0] is edge:
+            return entry[1]
+
         value = self._option_value(
             edge,
             "org.eclipse.elk.edge.thickness",
@@ -216,15 +490,17 @@ class GraphRender:
             "edge.thickness",
             "stroke.width",
         )
-        if value is None:
-            return None
-        try:
-            parsed = float(value)
-        except (TypeError, ValueError):
-            return None
-        if parsed <= 0:
-            return 1.0
-        return parsed
+        result: Optional[Number] = None
+        if value is not None:
+            try:
+                result = float(value)
+            except (TypeError, ValueError):
+                result = None
+            else:
+                if result <= 0:
+                    result = 1.0
+        self._thickness_memo[id(edge)] = (edge, result)
+        return result
 
     def _edge_type(self, edge: Dict) -> Optional[str]:
         """Return the edge type when set directly on the edge object."""
@@ -234,37 +510,43 @@ class GraphRender:
     # ------------------------------------------------------------------ #
     # Icons
     # ------------------------------------------------------------------ #
-    def _resolve_icon_cache_dir(self) -> Optional[Path]:
+    @staticmethod
+    def _resolve_icon_cache_dir(env: Optional[Mapping[str, str]] = None) -> Optional[Path]:
         """
         Resolve the persistent icon cache directory.
 
         Override with GRAPHRENDER_ICON_CACHE_DIR. Set GRAPHRENDER_ICON_CACHE_DIR to an empty
-        string to disable disk caching.
+        string to disable disk caching. The resolution is a pure function of
+        `env` (os.environ by default), so callers and tests can inject a
+        mapping instead of mutating the process environment.
         """
-        raw = os.environ.get("GRAPHRENDER_ICON_CACHE_DIR")
+        if env is None:
+            env = os.environ
+        raw = env.get("GRAPHRENDER_ICON_CACHE_DIR")
         if raw is not None:
             raw = raw.strip()
             if not raw:
                 return None
             return Path(raw).expanduser()
 
-        xdg_cache = os.environ.get("XDG_CACHE_HOME")
+        xdg_cache = env.get("XDG_CACHE_HOME")
         if xdg_cache:
             return Path(xdg_cache).expanduser() / "graphrender" / "icons"
 
-        local_appdata = os.environ.get("LOCALAPPDATA")
+        local_appdata = env.get("LOCALAPPDATA")
         if local_appdata:
             return Path(local_appdata).expanduser() / "graphrender" / "icons"
 
+        home = env.get("HOME")
+        if home:
+            return Path(home).expanduser() / ".cache" / "graphrender" / "icons"
         return Path.home() / ".cache" / "graphrender" / "icons"
 
     def _icon_cache_path(self, icon_name: str) -> Optional[Path]:
         """Return the cache filename for an icon."""
         if self._icon_cache_dir is None:
             return None
-        safe = re.sub(r"[^a-zA-Z0-9_-]", "-", icon_name).strip("-_")
-        if not safe:
-            safe = "icon"
+        safe = _sanitize_icon_token(icon_name) or "icon"
         digest = hashlib.sha1(icon_name.encode("utf-8")).hexdigest()[:12]
         return self._icon_cache_dir / f"{safe}-{digest}.svg"
 
@@ -301,13 +583,17 @@ class GraphRender:
         return tag == "svg"
 
     def _store_icon_svg_to_disk(self, icon_name: str, svg_text: str) -> None:
-        """Persist an icon SVG to disk cache (best effort)."""
+        """Persist an icon SVG to disk cache atomically (best effort)."""
         path = self._icon_cache_path(icon_name)
         if path is None:
             return
         try:
             path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(svg_text, encoding="utf-8")
+            # Write-then-rename so concurrent renderers never read a
+            # partially written icon; os.replace is atomic on one filesystem.
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_text(svg_text, encoding="utf-8")
+            os.replace(tmp_path, path)
         except OSError:
             return
 
@@ -350,23 +636,49 @@ class GraphRender:
             self._icon_cache[icon_name] = None
             return None
 
+    def _prefetch_icons(self) -> None:
+        """
+        Fetch all distinct node icons concurrently before rendering.
+
+        Icon downloads otherwise happen one at a time during the defs
+        build, each paying a full network round-trip. Warming _icon_cache
+        from a small thread pool turns that into a single parallel batch.
+        A lone distinct icon gains nothing from a pool and stays on the
+        lazy path.
+        """
+        names = {
+            name
+            for node in self.nodes
+            for name in (self._normalize_icon_name(str(node["raw"].get("icon") or "")),)
+            if name
+        }
+        if len(names) < 2:
+            return
+        with ThreadPoolExecutor(max_workers=min(16, len(names))) as pool:
+            list(pool.map(self._fetch_icon_svg, names))
+
     def _icon_def_id(self, icon_name: str) -> str:
         """Return a stable, sanitized id for an icon definition."""
         existing = self._icon_def_ids.get(icon_name)
         if existing:
             return existing
 
-        safe = re.sub(r"[^a-zA-Z0-9_-]", "-", icon_name).strip("-_")
-        if not safe:
-            safe = "icon"
+        safe = _sanitize_icon_token(icon_name) or "icon"
         candidate = f"icon-{safe}"
-        if candidate in self._icon_def_ids.values():
-            suffix = hashlib.sha1(icon_name.encode("utf-8")).hexdigest()[:8]
+        if candidate in self._icon_def_id_set:
+            suffix = hashlib.blake2b(
+                icon_name.encode("utf-8"), digest_size=8
+            ).hexdigest()[:8]
             candidate = f"{candidate}-{suffix}"
 
         self._icon_def_ids[icon_name] = candidate
+        self._icon_def_id_set.add(candidate)
         return candidate
 
+    # Parsed geometries shared across instances, keyed by icon name plus a
+    # hash of the fetched SVG so a reused entry always matches the content.
+    _ICON_GEOM_SHARED: Dict[Tuple[str, int], Tuple[str, float, float]] = {}
+
     def _icon_geometry(self, icon_name: str) -> Optional[Tuple[str, float, float]]:
         """Return (inner_svg, width, height) for an icon, cached by name."""
         if icon_name in self._icon_geom_cache:
@@ -376,13 +688,24 @@ class GraphRender:
         if not svg_text:
             self._icon_geom_cache[icon_name] = None
             return None
-        try:
-            root = ET.fromstring(svg_text)
-        except ET.ParseError:
-            self._icon_geom_cache[icon_name] = None
-            return None
 
-        view_box = root.get("viewBox")
+        shared_key = (icon_name, hash(svg_text))
+        shared = self._ICON_GEOM_SHARED.get(shared_key)
+        if shared is not None:
+            self._icon_geom_cache[icon_name] = shared
+            return shared
+
+        # Scan the root tag's attributes with a regex; the full XML parse
+        # only runs when the opening <svg ...> tag cannot be located.
+        attrs = _svg_root_attrs(svg_text)
+        if attrs is None:
+            try:
+                attrs = ET.fromstring(svg_text).attrib
+            except ET.ParseError:
+                self._icon_geom_cache[icon_name] = None
+                return None
+
+        view_box = attrs.get("viewBox")
         vb_w = vb_h = None
         if view_box:
             parts = view_box.split()
@@ -394,8 +717,8 @@ class GraphRender:
 
         if vb_w is None or vb_h is None:
             try:
-                vb_w = float((root.get("width") or "0").replace("px", ""))
-                vb_h = float((root.get("height") or "0").replace("px", ""))
+                vb_w = float((attrs.get("width") or "0").replace("px", ""))
+                vb_h = float((attrs.get("height") or "0").replace("px", ""))
             except ValueError:
                 self._icon_geom_cache[icon_name] = None
                 return None
@@ -404,30 +727,30 @@ class GraphRender:
             self._icon_geom_cache[icon_name] = None
             return None
 
-        inner = "".join(ET.tostring(child, encoding="unicode") for child in list(root))
+        # Slice the children straight out of the fetched text instead of
+        # re-serializing each parsed subtree with ET.tostring.
+        open_end = svg_text.find(">", svg_text.find("<svg")) + 1
+        close_start = svg_text.rfind("</svg")
+        if 0 < open_end <= close_start:
+            inner = svg_text[open_end:close_start]
+        else:
+            try:
+                root = ET.fromstring(svg_text)
+            except ET.ParseError:
+                self._icon_geom_cache[icon_name] = None
+                return None
+            inner = "".join(
+                ET.tostring(child, encoding="unicode") for child in list(root)
+            )
         cached = (inner, vb_w, vb_h)
         self._icon_geom_cache[icon_name] = cached
+        self._ICON_GEOM_SHARED[shared_key] = cached
         return cached
 
     def _raw_element(self, text: str):
         """Return a svg.Raw (or inline fallback) for a raw SVG fragment."""
-        raw_cls = getattr(svg, "Raw", None)
-        if raw_cls:
-            try:
-                return raw_cls(text)
-            except Exception:
-                pass
-
-        class _InlineRaw:
-            def __init__(self, raw_text: str) -> None:
-                self.text = raw_text
-
-            def as_str(self) -> str:
-                return self.text
-
-            def __str__(self) -> str:
-                return self.text
-
+        if _SVG_RAW is not None:
+            return _SVG_RAW(text)
         return _InlineRaw(text)
 
     def _icon_element(self, icon_name: str, node: Dict):
@@ -436,48 +759,57 @@ class GraphRender:
         within the node rectangle. Parsing and viewBox extraction are cached
         per icon to avoid repeated XML parsing.
         """
-        cached = self._icon_geometry(icon_name)
-        if cached is None:
-            return None
+        node_w = node["width"]
+        node_h = node["height"]
+        tail_key = (icon_name, node_w, node_h)
+        tail = self._icon_transform_cache.get(tail_key)
+        if tail is None:
+            cached = self._icon_geometry(icon_name)
+            if cached is None:
+                return None
 
-        _, vb_w, vb_h = cached
+            _, vb_w, vb_h = cached
 
-        margin = 4
-        target_w = max(node["width"] - margin * 2, 1)
-        target_h = max(node["height"] - margin * 2, 1)
-        scale = min(target_w / vb_w, target_h / vb_h)
+            margin = 4
+            target_w = max(node_w - margin * 2, 1)
+            target_h = max(node_h - margin * 2, 1)
+            scale = min(target_w / vb_w, target_h / vb_h)
 
-        cx = node["x"] + node["width"] / 2
-        cy = node["y"] + node["height"] / 2
+            icon_id = self._icon_def_id(icon_name)
+            tail = (
+                f'scale({scale}) translate({-vb_w/2},{-vb_h/2})">'
+                f'<use href="#{icon_id}"/></g>'
+            )
+            self._icon_transform_cache[tail_key] = tail
 
-        icon_id = self._icon_def_id(icon_name)
-        g_str = (
-            f'<g class="icon" transform="translate({cx},{cy}) '
-            f'scale({scale}) translate({-vb_w/2},{-vb_h/2})">'
-            f'<use href="#{icon_id}"/></g>'
-        )
+        cx = node["x"] + node_w / 2
+        cy = node["y"] + node_h / 2
+        g_str = f'<g class="icon" transform="translate({cx},{cy}) {tail}'
 
+        if self._emit_raw:
+            return g_str
         return self._raw_element(g_str)
 
-    def _label_to_text(self, lbl: Dict, owner_kind: Optional[str] = None) -> svg.Text:
-        """Create an svg.Text element for a label dict."""
-        x = lbl["x"] + lbl.get("width", 0) / 2
-        y = lbl["y"] + lbl.get("height", 0) / 2
-        lbl_font_size = lbl.get("font_size") or self.font_size
-        text_anchor = self._label_text_anchor(lbl.get("owner"), owner_kind=owner_kind)
+    def _label_to_text(self, lbl: _Label, owner_kind: Optional[str] = None) -> svg.Text:
+        """Create an svg.Text element for a label record."""
+        x = lbl.x + lbl.width / 2
+        y = lbl.y + lbl.height / 2
+        lbl_font_size = lbl.font_size or self.font_size
+        text_anchor = self._label_text_anchor(lbl.owner, owner_kind=owner_kind)
         dominant_baseline = "middle"
-        owner = lbl.get("owner")
-        if owner_kind is None and owner and owner in self.port_lookup:
+        owner = lbl.owner
+        if owner_kind is None and owner and self._owner_kind.get(owner) == "port":
             owner_kind = "port"
-        if owner_kind == "port" and owner and owner in self.port_lookup:
-            port = self.port_lookup[owner]
-            port_center_y = port["y"] + port.get("height", 0) / 2
-            if y < port_center_y - 1e-6:
-                dominant_baseline = "text-before-edge"
-            elif y > port_center_y + 1e-6:
-                dominant_baseline = "text-after-edge"
+        if owner_kind == "port" and owner:
+            center = self.port_center_lookup.get(owner)
+            if center is not None:
+                port_center_y = center[1]
+                if y < port_center_y - 1e-6:
+                    dominant_baseline = "text-before-edge"
+                elif y > port_center_y + 1e-6:
+                    dominant_baseline = "text-after-edge"
         return svg.Text(
-            text=lbl.get("text", ""),
+            text=lbl.text,
             x=x,
             y=y,
             font_size=lbl_font_size,
@@ -486,13 +818,13 @@ class GraphRender:
             fill="#111",
         )
 
-    def _label_background_rect(self, lbl: Dict) -> Optional[svg.Rect]:
+    def _label_background_rect(self, lbl: _Label) -> Optional[svg.Rect]:
         """Build a label background rect from x/y/width/height."""
         try:
-            x = float(lbl.get("x", 0))
-            y = float(lbl.get("y", 0))
-            width = float(lbl.get("width", 0))
-            height = float(lbl.get("height", 0))
+            x = float(lbl.x)
+            y = float(lbl.y)
+            width = float(lbl.width)
+            height = float(lbl.height)
         except (TypeError, ValueError):
             return None
         if width <= 0 or height <= 0:
@@ -514,13 +846,18 @@ class GraphRender:
     @classmethod
     def from_file(cls, path: str | Path, **kwargs) -> "GraphRender":
         """Load ELK JSON from a file."""
-        data = json.loads(Path(path).read_text())
+        raw = Path(path).read_bytes()
+        # Strip a UTF-8 BOM up front: orjson rejects it and stdlib json
+        # would otherwise rescan the buffer to detect the encoding.
+        if raw[:3] == b"\xef\xbb\xbf":
+            raw = raw[3:]
+        data = _json_loads(raw)
         return cls(data, **kwargs)
 
     @classmethod
     def from_json(cls, json_str: str, **kwargs) -> "GraphRender":
         """Load ELK JSON from a JSON string."""
-        data = json.loads(json_str)
+        data = _json_loads(json_str)
         return cls(data, **kwargs)
 
     @classmethod
@@ -551,13 +888,13 @@ class GraphRender:
 
         root.elements.append(self._build_defs())
 
-        label_maps = self._partition_labels()
+        label_maps, owners_with_text = self._partition_labels()
 
         edges_group = self._build_edges_group(label_maps)
         if edges_group is not None:
             root.elements.append(edges_group)
 
-        nodes_group = self._build_nodes_group(label_maps)
+        nodes_group = self._build_nodes_group(label_maps, owners_with_text)
         if nodes_group is not None:
             root.elements.append(nodes_group)
 
@@ -576,102 +913,62 @@ class GraphRender:
         if not css_text:
             return None
 
-        style_cls = getattr(svg, "Style", None)
-        if style_cls:
-            try:
-                return style_cls(content=css_text)
-            except Exception:
-                pass
-
-        raw_cls = getattr(svg, "Raw", None)
-        if raw_cls:
-            try:
-                return raw_cls(f"<style>{css_text}</style>")
-            except Exception:
-                pass
-
-        class _InlineStyle:
-            def __init__(self, css: str) -> None:
-                self.css = css
-
-            def as_str(self) -> str:
-                return f"<style>{self.css}</style>"
-
-            def __str__(self) -> str:  # svg.py may fall back to str()
-                return self.as_str()
-
+        if _SVG_STYLE is not None:
+            return _SVG_STYLE(content=css_text)
+        if _SVG_RAW is not None:
+            return _SVG_RAW(f"<style>{css_text}</style>")
         return _InlineStyle(css_text)
 
-    def _indent_xml_tree(
-        self, elem: ET.Element, *, indent: str = "  ", level: int = 0
-    ) -> None:
-        """Backport-style XML indentation for runtimes without ET.indent."""
-        children = list(elem)
-        if not children:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = "\n" + (indent * level)
-            return
-
-        child_ws = "\n" + (indent * (level + 1))
-        parent_ws = "\n" + (indent * level)
-
-        if not elem.text or not elem.text.strip():
-            elem.text = child_ws
-
-        for child in children:
-            self._indent_xml_tree(child, indent=indent, level=level + 1)
-            if not child.tail or not child.tail.strip():
-                child.tail = child_ws
-
-        if not children[-1].tail or not children[-1].tail.strip():
-            children[-1].tail = parent_ws
-
-        if level and (not elem.tail or not elem.tail.strip()):
-            elem.tail = parent_ws
-
-    def _xml_local_name(self, tag: str) -> str:
-        """Return an element's local tag name without XML namespace."""
-        if "}" in tag:
-            return tag.rsplit("}", 1)[-1]
-        return tag
-
-    def _indent_style_blocks(
-        self, elem: ET.Element, *, indent: str = "  ", level: int = 0
-    ) -> None:
-        """
-        Force CSS to start on a new line and be indented relative to <style>.
+    def _pretty_xml(self, xml_text: str, *, indent: str = "  ") -> str:
         """
-        if self._xml_local_name(elem.tag) == "style":
-            css_text = (elem.text or "").strip()
-            if css_text:
-                parent_prefix = indent * level
-                child_prefix = indent * (level + 1)
-                lines = css_text.splitlines()
-                formatted_lines = [
-                    (f"{child_prefix}{line}" if line else "")
-                    for line in lines
-                ]
-                elem.text = "\n" + "\n".join(formatted_lines) + "\n" + parent_prefix
-
-        for child in list(elem):
-            self._indent_style_blocks(child, indent=indent, level=level + 1)
+        Pretty-format serialized SVG in a single linear scan.
 
-    def _pretty_xml(self, xml_text: str, *, indent: str = "  ") -> str:
-        """Return pretty-formatted XML when parsing succeeds."""
-        try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
-            return xml_text
+        Tags are split onto their own lines and indented by nesting depth;
+        <style> bodies keep their CSS lines one level deeper than the tag.
+        Working on the flat string avoids re-parsing the document into an
+        ElementTree just to rewrite whitespace.
+        """
+        text = _ADJACENT_TAGS.sub(">\n<", xml_text)
+        text = _STYLE_OPEN.sub("\\1\n", text)
+        text = text.replace("</style>", "\n</style>")
+
+        out: List[str] = []
+        emit = out.append
+        depth = 0
+        css_buffer: Optional[List[str]] = None
+
+        for line in text.split("\n"):
+            if css_buffer is not None:
+                if line.startswith("</style"):
+                    while css_buffer and not css_buffer[-1]:
+                        css_buffer.pop()
+                    out.extend(css_buffer)
+                    css_buffer = None
+                    depth -= 1
+                    emit(indent * depth + line)
+                elif line or css_buffer:
+                    css_buffer.append(indent * depth + line if line else "")
+                continue
 
-        indent_fn = getattr(ET, "indent", None)
-        if callable(indent_fn):
-            indent_fn(root, space=indent)
-        else:
-            self._indent_xml_tree(root, indent=indent)
+            if not line:
+                continue
+            if line.startswith("</"):
+                depth -= 1
+                emit(indent * depth + line)
+                continue
 
-        self._indent_style_blocks(root, indent=indent)
+            emit(indent * depth + line)
+            if (
+                line.endswith(">")
+                and not line.endswith("/>")
+                and "</" not in line
+                and not line.startswith(("<?", "<!"))
+            ):
+                depth += 1
+                if line.startswith("<style"):
+                    css_buffer = []
 
-        return ET.tostring(root, encoding="unicode", short_empty_elements=True) + "\n"
+        return "\n".join(out) + "\n"
 
     def to_string(self, *, pretty: bool = True, indent: str = "  ") -> str:
         """Return the SVG as a string."""
@@ -682,80 +979,169 @@ class GraphRender:
 
     def write(self, path: str | Path, *, pretty: bool = True, indent: str = "  ") -> None:
         """Write the SVG to disk."""
-        Path(path).write_text(
-            self.to_string(pretty=pretty, indent=indent),
-            encoding="utf-8",
+        Path(path).write_bytes(
+            self.to_string(pretty=pretty, indent=indent).encode("utf-8")
+        )
+
+    def render_to(self, stream: TextIO) -> None:
+        """
+        Write compact SVG to a text stream without assembling the full tree.
+
+        Edge and node groups are serialized and discarded one at a time, so
+        peak memory tracks the largest single group rather than the whole
+        document. Output matches to_string(pretty=False).
+        """
+        width, height = self._canvas_size()
+        write = stream.write
+        write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{width}" height="{height}">'
         )
 
+        bg_rect = self._build_background_rect(width, height)
+        if bg_rect:
+            write(bg_rect.as_str())
+
+        style_el = self._build_style_element()
+        if style_el:
+            write(style_el.as_str())
+
+        write(self._build_defs().as_str())
+
+        label_maps, owners_with_text = self._partition_labels()
+        for group_id, iterator in (
+            ("edges", self._iter_edge_groups(label_maps)),
+            ("nodes", self._iter_node_groups(label_maps, owners_with_text)),
+        ):
+            opened = False
+            for element in iterator:
+                if not opened:
+                    write(f'<g id="{group_id}">')
+                    opened = True
+                write(element if isinstance(element, str) else element.as_str())
+            if opened:
+                write("</g>")
+
+        write("</svg>")
+
     # ------------------------------------------------------------------ #
     # Graph collection
     # ------------------------------------------------------------------ #
     def _collect_graph(self, graph: Dict, offset: Point) -> None:
         """
-        Traverse the ELK graph recursively and accumulate:
+        Traverse the ELK graph iteratively and accumulate:
         - nodes (absolute coordinates)
         - ports (absolute coordinates)
         - labels (node + edge)
         - edges (with the offset of their containing graph)
 
         ELK coordinates are relative to the containing graph. We normalize
-        everything into the root coordinate system by carrying an `offset`
-        down the recursion.
+        everything into the root coordinate system by carrying the base
+        offset on an explicit work stack instead of recursive frames, which
+        avoids recursion overhead (and depth limits) on deeply nested
+        compound graphs. Entry order matches the old recursive DFS: each
+        subtree's nodes and edges precede the containing graph's edges.
         """
-        base_x = offset[0] + graph.get("x", 0)
-        base_y = offset[1] + graph.get("y", 0)
-        base_offset = (base_x, base_y)
+        nodes_append = self.nodes.append
+        labels_append = self.labels.append
+        edges_append = self.edges.append
+        node_lookup = self.node_lookup
+        port_lookup = self.port_lookup
+        font_size = self._font_size
+
+        root_base = (offset[0] + graph.get("x", 0), offset[1] + graph.get("y", 0))
+        # Entries are ("node", elk_node, containing_base) or
+        # ("edges", elk_graph, own_base); LIFO order reproduces the DFS.
+        stack: deque = deque()
+        stack.append(("edges", graph, root_base))
+        for node in reversed(graph.get("children", [])):
+            stack.append(("node", node, root_base))
+
+        while stack:
+            kind, item, base = stack.pop()
+
+            if kind == "edges":
+                for edge in item.get("edges", []):
+                    # Styling is layout-invariant; resolve render, thickness
+                    # and CSS classes once at ingest so render loops touch
+                    # no layoutOptions at all.
+                    thickness = self._edge_thickness(edge)
+                    if thickness is None:
+                        thickness = self.edge_style["stroke_width"]
+                    etype = self._edge_type(edge)
+                    classes = "edge"
+                    if etype:
+                        classes += f" {css_class_token(etype)}"
+                    edges_append(
+                        {
+                            "edge": edge,
+                            "offset": base,
+                            "render": self._edge_rendering(edge),
+                            "thickness": thickness,
+                            "class": classes,
+                        }
+                    )
+                    for label in edge.get("labels", []):
+                        labels_append(
+                            _Label(
+                                owner_kind="edge",
+                                owner=edge["id"],
+                                id=label.get("id"),
+                                text=label.get("text", ""),
+                                x=base[0] + label.get("x", 0),
+                                y=base[1] + label.get("y", 0),
+                                width=label.get("width", 0),
+                                height=label.get("height", 0),
+                                font_size=font_size(label),
+                            )
+                        )
+                continue
 
-        for node in graph.get("children", []):
-            abs_x = base_offset[0] + node.get("x", 0)
-            abs_y = base_offset[1] + node.get("y", 0)
+            abs_x = base[0] + item.get("x", 0)
+            abs_y = base[1] + item.get("y", 0)
             record = {
-                "id": node["id"],
+                "id": item["id"],
                 "x": abs_x,
                 "y": abs_y,
-                "width": node.get("width", 0),
-                "height": node.get("height", 0),
-                "raw": node,
+                "width": item.get("width", 0),
+                "height": item.get("height", 0),
+                "raw": item,
             }
-            self.nodes.append(record)
-            self.node_lookup[record["id"]] = record
+            nodes_append(record)
+            node_lookup[record["id"]] = record
 
             # Node labels (coordinates relative to the node).
-            for label in node.get("labels", []):
-                self.labels.append(
-                    {
-                        "owner_kind": "node",
-                        "owner": node["id"],
-                        "id": label.get("id"),
-                        "text": label.get("text", ""),
-                        "x": abs_x + label.get("x", 0),
-                        "y": abs_y + label.get("y", 0),
-                        "width": label.get("width", 0),
-                        "height": label.get("height", 0),
-                        "font_size": self._font_size(label),
-                    }
+            for label in item.get("labels", []):
+                labels_append(
+                    _Label(
+                        owner_kind="node",
+                        owner=item["id"],
+                        id=label.get("id"),
+                        text=label.get("text", ""),
+                        x=abs_x + label.get("x", 0),
+                        y=abs_y + label.get("y", 0),
+                        width=label.get("width", 0),
+                        height=label.get("height", 0),
+                        font_size=font_size(label),
+                    )
                 )
 
             # Ports (coordinates relative to the node).
-            for port in node.get("ports", []):
+            for port in item.get("ports", []):
                 port_abs_x = abs_x + port.get("x", 0)
                 port_abs_y = abs_y + port.get("y", 0)
                 port_abs = {
                     "id": port["id"],
-                    "owner": node["id"],
+                    "owner": item["id"],
                     "x": port_abs_x,
                     "y": port_abs_y,
                     "width": port.get("width", 0),
                     "height": port.get("height", 0),
                     "raw": port,
-                    "side": self._port_side(
-                        record,
-                        port,
-                        port_abs_x=port_abs_x,
-                        port_abs_y=port_abs_y,
-                    ),
+                    # Filled in by _assign_port_sides after collection.
+                    "side": None,
                 }
-                self.port_lookup[port_abs["id"]] = port_abs
+                port_lookup[port_abs["id"]] = port_abs
 
                 # Port labels (coordinates relative to the port). If ELK didn't
                 # emit coordinates, place the label at the port center.
@@ -769,49 +1155,46 @@ class GraphRender:
                         lx = port_abs["x"] + lx
                         ly = port_abs["y"] + ly
 
-                    self.labels.append(
-                        {
-                            "owner_kind": "port",
-                            "owner": port["id"],
-                            "id": label.get("id"),
-                            "text": label.get("text", ""),
-                            "x": lx,
-                            "y": ly,
-                            "width": label.get("width", 0),
-                            "height": label.get("height", 0),
-                            "font_size": self._font_size(label),
-                        }
+                    labels_append(
+                        _Label(
+                            owner_kind="port",
+                            owner=port["id"],
+                            id=label.get("id"),
+                            text=label.get("text", ""),
+                            x=lx,
+                            y=ly,
+                            width=label.get("width", 0),
+                            height=label.get("height", 0),
+                            font_size=font_size(label),
+                        )
                     )
 
-            # Recurse into nested graphs.
-            self._collect_graph(node, base_offset)
-
-        # Edge labels are stored alongside the edge.
-        for edge in graph.get("edges", []):
-            self.edges.append({"edge": edge, "offset": base_offset})
-            for label in edge.get("labels", []):
-                self.labels.append(
-                    {
-                        "owner_kind": "edge",
-                        "owner": edge["id"],
-                        "id": label.get("id"),
-                        "text": label.get("text", ""),
-                        "x": base_offset[0] + label.get("x", 0),
-                        "y": base_offset[1] + label.get("y", 0),
-                        "width": label.get("width", 0),
-                        "height": label.get("height", 0),
-                        "font_size": self._font_size(label),
-                    }
-                )
+            # Nested graphs: own edges run after the whole subtree.
+            child_base = (abs_x, abs_y)
+            stack.append(("edges", item, child_base))
+            for child in reversed(item.get("children", [])):
+                stack.append(("node", child, child_base))
 
     # ------------------------------------------------------------------ #
     # Drawing helpers
     # ------------------------------------------------------------------ #
+    # Marker sets shared across instances; they depend only on the edge
+    # stroke width (colors all ride on currentColor).
+    _MARKER_CACHE: Dict[float, Tuple[svg.Marker, ...]] = {}
+
     def _build_defs(self) -> svg.Defs:
         """Marker definitions (arrow heads, etc.). Memoized per instance."""
         if self._defs_cache is not None:
             return self._defs_cache
 
+        key = float(self.edge_style["stroke_width"])
+        markers = self._MARKER_CACHE.get(key)
+        if markers is not None:
+            elements = list(markers)
+            elements.extend(self._build_icon_defs())
+            self._defs_cache = svg.Defs(elements=elements)
+            return self._defs_cache
+
         arrow = svg.Marker(
             id="arrow",
             markerWidth=10,
@@ -900,7 +1283,9 @@ class GraphRender:
             ],
         )
 
-        elements = [arrow, open_arrow, dependency_open_arrow, triangle_hollow]
+        markers = (arrow, open_arrow, dependency_open_arrow, triangle_hollow)
+        self._MARKER_CACHE[key] = markers
+        elements = list(markers)
         elements.extend(self._build_icon_defs())
         self._defs_cache = svg.Defs(elements=elements)
         return self._defs_cache
@@ -947,116 +1332,306 @@ class GraphRender:
         except Exception:
             return None
 
-    def _build_nodes_group(self, label_maps: Dict[str, Dict[str, List[Dict]]]) -> Optional[svg.G]:
+    # ------------------------------------------------------------------ #
+    # Shape emission
+    # ------------------------------------------------------------------ #
+    def _shape_group(
+        self,
+        elements: List,
+        *,
+        id: Optional[str] = None,
+        class_: Optional[str] = None,
+    ):
+        """A <g> wrapper around already-built children, in the active mode."""
+        if not self._emit_raw:
+            return svg.G(id=id, class_=class_, elements=elements)
+        attrs = ""
+        if id is not None:
+            attrs += f' id="{id}"'
+        if class_ is not None:
+            attrs += f' class="{class_}"'
+        return f"<g{attrs}>{''.join(elements)}</g>"
+
+    def _shape_node_rect(self, x: Number, y: Number, width: Number, height: Number):
+        style = self.node_style
+        x, y, width, height = _fmt(x), _fmt(y), _fmt(width), _fmt(height)
+        if not self._emit_raw:
+            return svg.Rect(
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                fill=style["fill"],
+                stroke=style["stroke"],
+                rx=style.get("rx"),
+            )
+        return (
+            f'<rect x="{x}" y="{y}" width="{width}" height="{height}" '
+            f'{self._node_rect_attrs}/>'
+        )
+
+    def _shape_port_rect(self, x: Number, y: Number, width: Number, height: Number):
+        style = self.port_style
+        x, y, width, height = _fmt(x), _fmt(y), _fmt(width), _fmt(height)
+        if not self._emit_raw:
+            return svg.Rect(
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                fill=style["fill"],
+                stroke=style["stroke"],
+            )
+        return (
+            f'<rect x="{x}" y="{y}" width="{width}" height="{height}" '
+            f'{self._port_rect_attrs}/>'
+        )
+
+    def _shape_polyline(
+        self, points: List[Point], thickness: Number, render: "_EdgeRender"
+    ):
+        stroke = self.edge_style["stroke"]
+        marker_start, marker_end, dasharray = render
+        pts = " ".join(f"{x:.2f} {y:.2f}" for x, y in points)
+        if not self._emit_raw:
+            poly_kwargs = {
+                "points": pts,
+                "stroke": stroke,
+                "fill": "none",
+                "stroke_width": thickness,
+            }
+            if marker_end:
+                poly_kwargs["marker_end"] = marker_end
+            if marker_start:
+                poly_kwargs["marker_start"] = marker_start
+            if dasharray:
+                poly_kwargs["stroke_dasharray"] = dasharray
+            return svg.Polyline(**poly_kwargs)
+
+        extra = ""
+        if marker_end:
+            extra += f' marker-end="{marker_end}"'
+        if marker_start:
+            extra += f' marker-start="{marker_start}"'
+        if dasharray:
+            extra += f' stroke-dasharray="{dasharray}"'
+        return (
+            f'<polyline points="{pts}" stroke="{stroke}" fill="none" '
+            f'stroke-width="{thickness}"{extra}/>'
+        )
+
+    def _shape_path(self, d: str, thickness: Number, render: "_EdgeRender"):
+        stroke = self.edge_style["stroke"]
+        marker_start, marker_end, dasharray = render
+        if not self._emit_raw:
+            path_kwargs = {
+                "d": d,
+                "stroke": stroke,
+                "fill": "none",
+                "stroke_width": thickness,
+            }
+            if marker_end:
+                path_kwargs["marker_end"] = marker_end
+            if marker_start:
+                path_kwargs["marker_start"] = marker_start
+            if dasharray:
+                path_kwargs["stroke_dasharray"] = dasharray
+            return svg.Path(**path_kwargs)
+
+        extra = ""
+        if marker_end:
+            extra += f' marker-end="{marker_end}"'
+        if marker_start:
+            extra += f' marker-start="{marker_start}"'
+        if dasharray:
+            extra += f' stroke-dasharray="{dasharray}"'
+        return (
+            f'<path d="{d}" stroke="{stroke}" fill="none" '
+            f'stroke-width="{thickness}"{extra}/>'
+        )
+
+    def _shape_circle(
+        self, cx: Number, cy: Number, r: Number, fill: str, stroke: Optional[str] = None
+    ):
+        cx, cy = _fmt(cx), _fmt(cy)
+        if not self._emit_raw:
+            if stroke is not None:
+                return svg.Circle(cx=cx, cy=cy, r=r, fill=fill, stroke=stroke)
+            return svg.Circle(cx=cx, cy=cy, r=r, fill=fill)
+        stroke_attr = f' stroke="{stroke}"' if stroke is not None else ""
+        return f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{fill}"{stroke_attr}/>'
+
+    def _shape_dot_path(
+        self,
+        centers: List[Point],
+        r: Number,
+        fill: str,
+        stroke: Optional[str] = None,
+    ):
+        """One <path> of arc pairs standing in for many same-style circles."""
+        d = "".join(
+            f"M{_fmt(cx - r)} {_fmt(cy)}"
+            f"a{r} {r} 0 1 0 {2 * r} 0"
+            f"a{r} {r} 0 1 0 {-2 * r} 0"
+            for cx, cy in centers
+        )
+        if not self._emit_raw:
+            if stroke is not None:
+                return svg.Path(d=d, fill=fill, stroke=stroke)
+            return svg.Path(d=d, fill=fill)
+        stroke_attr = f' stroke="{stroke}"' if stroke is not None else ""
+        return f'<path d="{d}" fill="{fill}"{stroke_attr}/>'
+
+    def _shape_label_text(self, lbl: _Label, owner_kind: str):
+        text = self._label_to_text(lbl, owner_kind=owner_kind)
+        return text.as_str() if self._emit_raw else text
+
+    def _shape_label_background(self, lbl: _Label):
+        rect = self._label_background_rect(lbl)
+        if rect is None or not self._emit_raw:
+            return rect
+        return rect.as_str()
+
+    def _build_nodes_group(
+        self,
+        label_maps: Dict[str, Dict[str, List[_Label]]],
+        owners_with_text: set,
+    ) -> Optional[svg.G]:
         """Create the nodes group with nested ports and labels."""
-        owners_with_labels = {lbl["owner"] for lbl in self.labels if lbl.get("text")}
-        nodes_root = svg.G(id="nodes", elements=[])
+        node_groups = list(self._iter_node_groups(label_maps, owners_with_text))
+        if not node_groups:
+            return None
+
+        return svg.G(id="nodes", elements=node_groups)
+
+    def _iter_node_groups(
+        self,
+        label_maps: Dict[str, Dict[str, List[_Label]]],
+        owners_with_text: set,
+    ) -> Iterable:
+        """Yield one finished element per node; render_to streams these."""
 
         node_label_map = label_maps["node"]
         port_label_map = label_maps["port"]
 
         for node in self.nodes:
+            # Hoist the per-node fields read several times below.
+            node_id = node["id"]
+            raw = node["raw"]
+            node_x = node["x"]
+            node_y = node["y"]
+            node_w = node["width"]
+            node_h = node["height"]
+
             node_classes = ["node"]
-            node_type = node["raw"].get("type")
+            node_type = raw.get("type")
             if node_type:
                 node_classes.append(css_class_token(node_type))
 
-            node_group = svg.G(
-                id=node["id"], class_=" ".join(node_classes), elements=[]
-            )
-
             # Node shape
-            rect = svg.Rect(
-                x=node["x"],
-                y=node["y"],
-                width=node["width"],
-                height=node["height"],
-                fill=self.node_style["fill"],
-                stroke=self.node_style["stroke"],
-                rx=self.node_style.get("rx"),
-            )
-            node_group.elements.append(rect)
+            children: List = [self._shape_node_rect(node_x, node_y, node_w, node_h)]
 
             # Centered icon (if provided via node["raw"]["icon"]).
-            icon_name = self._normalize_icon_name(str(node["raw"].get("icon") or ""))
+            icon_name = self._normalize_icon_name(str(raw.get("icon") or ""))
             if icon_name:
                 icon_el = self._icon_element(icon_name, node)
                 if icon_el:
-                    node_group.elements.append(icon_el)
+                    children.append(icon_el)
 
             # Node labels
-            node_labels_g = svg.G(class_="labels", elements=[])
-            for lbl in node_label_map.get(node["id"], []):
-                node_labels_g.elements.append(self._label_to_text(lbl, owner_kind="node"))
-            if not node_labels_g.elements and node["id"] not in owners_with_labels:
-                center_x = node["x"] + node["width"] / 2
-                center_y = node["y"] + node["height"] / 2
-                node_labels_g.elements.append(
-                    svg.Text(
-                        text=node["id"],
-                        x=center_x,
-                        y=center_y,
+            node_labels: List = [
+                self._shape_label_text(lbl, "node")
+                for lbl in node_label_map.get(node_id, [])
+            ]
+            if not node_labels:
+                if node_id not in owners_with_text:
+                    fallback = svg.Text(
+                        text=node_id,
+                        x=node_x + node_w / 2,
+                        y=node_y + node_h / 2,
                         font_size=self.font_size,
                         text_anchor="middle",
                         dominant_baseline="middle",
                         fill="#111",
                     )
-                )
-            node_group.elements.append(node_labels_g)
+                    node_labels.append(
+                        fallback.as_str() if self._emit_raw else fallback
+                    )
+            # The .labels wrapper is a styling hook (the bundled theme
+            # selects through it with child combinators), so it is kept
+            # even for a single label; empty sets emit nothing.
+            if node_labels:
+                children.append(self._shape_group(node_labels, class_="labels"))
 
             # Ports
-            ports_g = svg.G(class_="ports", elements=[])
-            for port in (node["raw"].get("ports") or []):
-                port_abs = self.port_lookup[port["id"]]
-                port_g = svg.G(id=port["id"], class_="port", elements=[])
-                port_rect = svg.Rect(
-                    x=port_abs["x"],
-                    y=port_abs["y"],
-                    width=port_abs.get("width", 0),
-                    height=port_abs.get("height", 0),
-                    fill=self.port_style["fill"],
-                    stroke=self.port_style["stroke"],
-                )
-                port_g.elements.append(port_rect)
+            port_groups: List = []
+            for port in (raw.get("ports") or []):
+                port_id = port["id"]
+                port_abs = self.port_lookup[port_id]
+                port_children: List = [
+                    self._shape_port_rect(
+                        port_abs["x"],
+                        port_abs["y"],
+                        port_abs.get("width", 0),
+                        port_abs.get("height", 0),
+                    )
+                ]
 
-                port_labels_g = svg.G(class_="labels", elements=[])
-                for lbl in port_label_map.get(port["id"], []):
-                    bg_rect = self._label_background_rect(lbl)
-                    if bg_rect is not None:
-                        port_labels_g.elements.append(bg_rect)
-                    port_labels_g.elements.append(self._label_to_text(lbl, owner_kind="port"))
-                if port_labels_g.elements:
-                    port_g.elements.append(port_labels_g)
+                lbls = port_label_map.get(port_id)
+                if lbls:
+                    port_labels: List = []
+                    for lbl in lbls:
+                        bg_rect = self._shape_label_background(lbl)
+                        if bg_rect is not None:
+                            port_labels.append(bg_rect)
+                        port_labels.append(self._shape_label_text(lbl, "port"))
+                    port_children.append(
+                        self._shape_group(port_labels, class_="labels")
+                    )
 
-                ports_g.elements.append(port_g)
+                port_groups.append(
+                    self._shape_group(port_children, id=port_id, class_="port")
+                )
 
-            if ports_g.elements:
-                node_group.elements.append(ports_g)
+            # Like .labels, the .ports wrapper is addressed by theme CSS.
+            if port_groups:
+                children.append(self._shape_group(port_groups, class_="ports"))
 
-            nodes_root.elements.append(node_group)
+            yield self._shape_group(
+                children, id=node_id, class_=" ".join(node_classes)
+            )
 
-        if not nodes_root.elements:
+    def _build_edges_group(self, label_maps: Dict[str, Dict[str, List[_Label]]]) -> Optional[svg.G]:
+        """Create edges group with per-edge subgroups and labels."""
+        edge_groups = list(self._iter_edge_groups(label_maps))
+        if not edge_groups:
             return None
 
-        return nodes_root
+        return svg.G(id="edges", elements=edge_groups)
 
-    def _build_edges_group(self, label_maps: Dict[str, Dict[str, List[Dict]]]) -> Optional[svg.G]:
-        """Create edges group with per-edge subgroups and labels."""
+    def _iter_edge_groups(self, label_maps: Dict[str, Dict[str, List[_Label]]]) -> Iterable:
+        """
+        Yield edges-group children in paint order.
+
+        With group_edges=True each per-edge group is yielded as soon as it
+        is built, so render_to never holds more than one edge in memory.
+        Batched mode must emit the shared paths before any wrapper group,
+        so wrappers are deferred until the buckets are complete.
+        """
         edge_labels = label_maps["edge"]
-        edges_root = svg.G(id="edges", elements=[])
+        deferred: List = []
+        # With group_edges=False, same-style sections share one <path>;
+        # keyed by (thickness, marker_start, marker_end, dasharray).
+        path_buckets: Dict[Tuple, List[str]] = {}
+        # Batched mode also merges point markers into one path per style.
+        bend_dots: List[Point] = []
+        junction_dots: List[Point] = []
 
         for entry in self.edges:
             edge = entry["edge"]
             offset = entry["offset"]
-            edge_classes = ["edge"]
-            etype = self._edge_type(edge)
-            if etype:
-                edge_classes.append(css_class_token(etype))
-
-            edge_group = svg.G(id=edge.get("id"), class_=" ".join(edge_classes), elements=[])
-            edge_thickness = self._edge_thickness(edge)
-            if edge_thickness is None:
-                edge_thickness = self.edge_style["stroke_width"]
+            ox, oy = offset
+            edge_thickness = entry["thickness"]
 
             sections = edge.get("sections") or []
             if not sections:
@@ -1064,62 +1639,77 @@ class GraphRender:
                 if fallback:
                     sections = [fallback]
 
+            # Edge-invariant styling, resolved at collection time.
+            render = entry["render"]
+
+            children: List = []
             for section in sections:
-                points = self._section_points(edge, section, offset)
+                points, bends = self._section_points(edge, section, offset)
                 if not points:
                     continue
-                render = self._edge_rendering(edge)
-                poly_kwargs = {
-                    "points": [coord for pt in points for coord in pt],
-                    "stroke": self.edge_style["stroke"],
-                    "fill": "none",
-                    "stroke_width": edge_thickness,
-                }
-                if render["marker_end"]:
-                    poly_kwargs["marker_end"] = render["marker_end"]
-                if render["marker_start"]:
-                    poly_kwargs["marker_start"] = render["marker_start"]
-                if render["stroke_dasharray"]:
-                    poly_kwargs["stroke_dasharray"] = render["stroke_dasharray"]
-
-                polyline = svg.Polyline(**poly_kwargs)
-                edge_group.elements.append(polyline)
+                if self._group_edges:
+                    children.append(
+                        self._shape_polyline(points, edge_thickness, render)
+                    )
+                else:
+                    key = (edge_thickness,) + render
+                    path_buckets.setdefault(key, []).append(
+                        "M " + " L ".join(f"{x:.2f} {y:.2f}" for x, y in points)
+                    )
 
                 # Bend points for visibility/debugging.
-                for bend in section.get("bendPoints", []) or []:
-                    bx, by = self._apply_offset(bend, offset)
-                    edge_group.elements.append(
-                        svg.Circle(cx=bx, cy=by, r=2, fill="#888", stroke="none")
-                    )
+                if self.show_bend_points:
+                    if self._group_edges:
+                        for bx, by in bends:
+                            children.append(
+                                self._shape_circle(bx, by, 2, "#888", stroke="none")
+                            )
+                    else:
+                        bend_dots.extend(bends)
 
             # Junction points.
             for jp in edge.get("junctionPoints", []) or []:
-                jx, jy = self._apply_offset(jp, offset)
-                edge_group.elements.append(svg.Circle(cx=jx, cy=jy, r=2.5, fill="#444"))
-
-            # Edge labels
-            labels_g = svg.G(class_="labels", elements=[])
-            for lbl in edge_labels.get(edge.get("id", ""), []):
-                if lbl.get("text"):
-                    bg_rect = self._label_background_rect(lbl)
-                    if bg_rect is not None:
-                        labels_g.elements.append(bg_rect)
-                labels_g.elements.append(self._label_to_text(lbl, owner_kind="edge"))
-            if labels_g.elements:
-                edge_group.elements.append(labels_g)
-
-            if edge_group.elements:
-                edges_root.elements.append(edge_group)
-
-        if not edges_root.elements:
-            return None
+                jx, jy = jp.get("x", 0) + ox, jp.get("y", 0) + oy
+                if self._group_edges:
+                    children.append(self._shape_circle(jx, jy, 2.5, "#444"))
+                else:
+                    junction_dots.append((jx, jy))
+
+            # Edge labels; most edges have none, so skip all allocation then.
+            lbls = edge_labels.get(edge.get("id", ""))
+            if lbls:
+                label_children: List = []
+                for lbl in lbls:
+                    if lbl.text:
+                        bg_rect = self._shape_label_background(lbl)
+                        if bg_rect is not None:
+                            label_children.append(bg_rect)
+                    label_children.append(self._shape_label_text(lbl, "edge"))
+                children.append(
+                    self._shape_group(label_children, class_="labels")
+                )
 
-        return edges_root
+            if children:
+                group = self._shape_group(
+                    children, id=edge.get("id"), class_=entry["class"]
+                )
+                if self._group_edges:
+                    yield group
+                else:
+                    deferred.append(group)
+
+        for key, segments in path_buckets.items():
+            yield self._shape_path(" ".join(segments), key[0], _EdgeRender(*key[1:]))
+        if bend_dots:
+            yield self._shape_dot_path(bend_dots, 2, "#888", stroke="none")
+        if junction_dots:
+            yield self._shape_dot_path(junction_dots, 2.5, "#444")
+        yield from deferred
 
     # ------------------------------------------------------------------ #
     # Edge styling
     # ------------------------------------------------------------------ #
-    def _edge_rendering(self, edge: Dict) -> Dict[str, Optional[str]]:
+    def _edge_rendering(self, edge: Dict) -> "_EdgeRender":
         """
         Map ELK's org.eclipse.elk.edge.type option to SVG styling. Defaults to
         the previous behavior (filled arrow at the target).
@@ -1133,85 +1723,70 @@ class GraphRender:
             or edge.get("type")
         )
         edge_type = str(edge_type).upper() if edge_type else ""
-
-        # Defaults preserve backward compatibility.
-        render = {
-            "marker_start": None,
-            "marker_end": "url(#arrow)",
-            "stroke_dasharray": None,
-        }
-
-        if edge_type in ("NONE", "UNDIRECTED"):
-            render.update({"marker_end": None})
-        elif edge_type == "DIRECTED":
-            render.update({"marker_end": "url(#arrow)"})
-        elif edge_type == "ASSOCIATION":
-            render.update({"marker_end": "url(#arrow-open)"})
-        elif edge_type == "DEPENDENCY":
-            render.update(
-                {
-                    "marker_end": "url(#arrow-open-dependency)",
-                    "stroke_dasharray": "6 3",
-                }
-            )
-        elif edge_type == "GENERALIZATION":
-            render.update({"marker_end": "url(#triangle-hollow)"})
-
-        return render
+        return _EDGE_TYPE_RENDER.get(edge_type, _DEFAULT_RENDER)
 
     # ------------------------------------------------------------------ #
     # Geometry helpers
     # ------------------------------------------------------------------ #
     def _canvas_size(self) -> Tuple[Number, Number]:
+        """Canvas extent incl. padding; the node-scan fallback runs once."""
+        if self._canvas_size_cache is not None:
+            return self._canvas_size_cache
+
         width = self.graph.get("width")
         height = self.graph.get("height")
         if width is None or height is None:
-            max_x = max((n["x"] + n.get("width", 0) for n in self.nodes), default=0)
-            max_y = max((n["y"] + n.get("height", 0) for n in self.nodes), default=0)
-            width = max_x
-            height = max_y
-
-        return width + self.padding * 2, height + self.padding * 2
+            width = max((n["x"] + n.get("width", 0) for n in self.nodes), default=0)
+            height = max((n["y"] + n.get("height", 0) for n in self.nodes), default=0)
 
-    def _port_center(self, port_id: str) -> Optional[Point]:
-        port = self.port_lookup.get(port_id)
-        if not port:
-            return None
-        return (
-            port["x"] + port.get("width", 0) / 2,
-            port["y"] + port.get("height", 0) / 2,
+        self._canvas_size_cache = (
+            width + self.padding * 2,
+            height + self.padding * 2,
         )
+        return self._canvas_size_cache
 
-    def _apply_offset(self, point: Dict, offset: Point) -> Point:
-        return point.get("x", 0) + offset[0], point.get("y", 0) + offset[1]
+    def _port_center(self, port_id: str) -> Optional[Point]:
+        return self.port_center_lookup.get(port_id)
 
     def _section_points(
         self, edge: Dict, section: Dict, offset: Point
-    ) -> List[Point]:
+    ) -> Tuple[List[Point], List[Point]]:
+        """
+        Resolve one section into polyline points, offsetting in a single pass.
+
+        Returns (points, bends) where bends is the already-offset slice of
+        points covering the bend points, so callers never walk bendPoints a
+        second time.
+        """
+        # Offsets are applied inline; a helper call per point costs a frame
+        # and a tuple on the hottest loop in edge rendering.
+        ox, oy = offset
         pts: List[Point] = []
 
         start = section.get("startPoint")
         if start:
-            pts.append(self._apply_offset(start, offset))
+            pts.append((start.get("x", 0) + ox, start.get("y", 0) + oy))
         else:
             start_port = (edge.get("sources") or [None])[0]
             start_pos = self._port_center(start_port) if start_port else None
             if start_pos:
                 pts.append(start_pos)
 
+        bends_from = len(pts)
         for bend in section.get("bendPoints", []) or []:
-            pts.append(self._apply_offset(bend, offset))
+            pts.append((bend.get("x", 0) + ox, bend.get("y", 0) + oy))
+        bends = pts[bends_from:]
 
         end = section.get("endPoint")
         if end:
-            pts.append(self._apply_offset(end, offset))
+            pts.append((end.get("x", 0) + ox, end.get("y", 0) + oy))
         else:
             target_port = (edge.get("targets") or [None])[0]
             end_pos = self._port_center(target_port) if target_port else None
             if end_pos:
                 pts.append(end_pos)
 
-        return pts
+        return pts, bends
 
     def _fallback_section(self, edge: Dict, offset: Point) -> Optional[Dict]:
         """Create a section when ELK did not emit one."""
@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+import functools
+import operator
 import re
+import string
 from dataclasses import dataclass
 from typing import Any, Mapping
 
+_INVALID_RUN = re.compile(r"[^a-zA-Z0-9_-]+")
+_CLEAN_CHARS = frozenset(string.ascii_lowercase + string.digits + "_-")
 
-@dataclass(frozen=True)
+# Single C-level pass for ASCII input: lowercase valid characters, mark
+# invalid ones with a sentinel whose runs collapse to one dash afterwards
+# (matching _INVALID_RUN's run-collapsing semantics).
+_SENTINEL = "\x00"
+_TOKEN_TABLE = str.maketrans(
+    {
+        ch: (ch.lower() if ch.lower() in _CLEAN_CHARS else _SENTINEL)
+        for ch in map(chr, range(128))
+    }
+)
+_SENTINEL_RUN = re.compile(r"\x00+")
+_BUNDLE_FIELDS = operator.itemgetter("profileId", "profileVersion", "checksum", "renderCss")
+
+
+# Value carrier only: no callsite compares or prints bundles, so skip the
+# generated __eq__/__repr__ entirely.
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class ResolvedProfileRenderBundle:
     profile_id: str
     profile_version: int
@@ -14,7 +35,23 @@ class ResolvedProfileRenderBundle:
 
 
 def css_class_token(value: Any) -> str:
-    token = re.sub(r"[^a-zA-Z0-9_-]+", "-", str(value or "").strip().lower())
+    raw = str(value or "")
+    if not raw:
+        return "type-unknown"
+    return _token_cached(raw)
+
+
+@functools.lru_cache(maxsize=2048)
+def _token_cached(raw: str) -> str:
+    """Normalize one type string; graphs repeat few distinct values."""
+    if raw.isascii():
+        token = raw.translate(_TOKEN_TABLE)
+        if _SENTINEL in token:
+            token = _SENTINEL_RUN.sub("-", token)
+    else:
+        token = raw.strip().lower()
+        if not _CLEAN_CHARS.issuperset(token):
+            token = _INVALID_RUN.sub("-", token)
     token = token.strip("-_")
     if not token:
         return "type-unknown"
@@ -23,17 +60,18 @@ def css_class_token(value: Any) -> str:
     return token
 
 
-def _require(bundle: Mapping[str, Any], field: str) -> Any:
-    if field not in bundle:
-        raise ValueError(f"Profile bundle is missing required field '{field}'.")
-    return bundle[field]
-
-
 def resolve_profile_render_bundle(bundle: Mapping[str, Any]) -> ResolvedProfileRenderBundle:
-    profile_id = str(_require(bundle, "profileId"))
-    profile_version = int(_require(bundle, "profileVersion"))
-    checksum = str(_require(bundle, "checksum"))
-    render_css = str(_require(bundle, "renderCss"))
+    try:
+        profile_id, profile_version, checksum, render_css = _BUNDLE_FIELDS(bundle)
+    except KeyError as exc:
+        raise ValueError(
+            f"Profile bundle is missing required field {exc.args[0]!r}."
+        ) from None
+
+    profile_id = str(profile_id)
+    profile_version = int(profile_version)
+    checksum = str(checksum)
+    render_css = str(render_css)
 
     if not render_css.strip():
         raise ValueError("Profile bundle field 'renderCss' must not be empty.")
@@ -1,10 +1,12 @@
+from functools import lru_cache
 from importlib import resources
 
 __all__ = ["default_theme_css"]
 
 
+@lru_cache(maxsize=1)
 def default_theme_css() -> str:
-    """Return the bundled default theme.css content."""
+    """Return the bundled default theme.css content, read once per process."""
     try:
         return resources.files("graphrender.resources").joinpath("default_theme.css").read_text()
     except Exception:
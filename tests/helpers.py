@@ -1,180 +1,217 @@
 from __future__ import annotations
 
-import copy
+import json
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from pathlib import Path
 
+from graphrender import GraphRender
+
 SVG_NS = {"svg": "http://www.w3.org/2000/svg"}
 
 
 def minimal_graph() -> dict:
-    return {
-        "id": "root",
-        "width": 10,
-        "height": 10,
-        "children": [],
-        "edges": [],
-    }
+    return deep_copy(_MINIMAL_GRAPH_TEMPLATE)
 
 
 def base_graph() -> dict:
-    return {
-        "id": "root",
-        "width": 220,
-        "height": 140,
-        "children": [
-            {
-                "id": "n1",
-                "x": 10,
-                "y": 20,
-                "width": 50,
-                "height": 30,
-                "type": "router",
-                "labels": [
-                    {
-                        "id": "nl1",
-                        "text": "Node 1",
-                        "x": 10,
-                        "y": 8,
-                        "width": 30,
-                        "height": 12,
-                    }
-                ],
-                "ports": [
-                    {
-                        "id": "n1p_w",
-                        "x": 0,
-                        "y": 12,
-                        "width": 4,
-                        "height": 4,
-                        "labels": [
-                            {
-                                "id": "pl_w",
-                                "text": "west",
-                                "x": -14,
-                                "y": 0,
-                                "width": 12,
-                                "height": 4,
-                            }
-                        ],
-                    },
-                    {
-                        "id": "n1p_e",
-                        "x": 46,
-                        "y": 12,
-                        "width": 4,
-                        "height": 4,
-                        "labels": [
-                            {
-                                "id": "pl_e",
-                                "text": "east",
-                                "x": 6,
-                                "y": 0,
-                                "width": 12,
-                                "height": 4,
-                            }
-                        ],
-                    },
-                ],
-            },
-            {
-                "id": "n2",
-                "x": 140,
-                "y": 20,
-                "width": 50,
-                "height": 30,
-                "labels": [],
-                "ports": [
-                    {
-                        "id": "n2p_w",
-                        "x": 0,
-                        "y": 12,
-                        "width": 4,
-                        "height": 4,
-                    }
-                ],
-            },
-        ],
-        "edges": [
-            {
-                "id": "e1",
-                "sources": ["n1p_e"],
-                "targets": ["n2p_w"],
-                "layoutOptions": {
-                    "org.eclipse.elk.edge.type": "DEPENDENCY",
-                    "org.eclipse.elk.edge.thickness": "2",
-                },
-                "sections": [
-                    {
-                        "id": "s1",
-                        "startPoint": {"x": 60, "y": 34},
-                        "bendPoints": [{"x": 100, "y": 34}],
-                        "endPoint": {"x": 140, "y": 34},
-                    }
-                ],
-                "junctionPoints": [{"x": 100, "y": 34}],
-                "labels": [
-                    {
-                        "id": "el1",
-                        "text": "edge-1",
-                        "x": 95,
-                        "y": 28,
-                        "width": 20,
-                        "height": 8,
-                    }
-                ],
-            }
-        ],
-    }
+    return deep_copy(_BASE_GRAPH_TEMPLATE)
 
 
 def graph_with_nested_node() -> dict:
-    return {
-        "id": "root",
-        "width": 300,
-        "height": 180,
-        "children": [
-            {
-                "id": "cluster",
-                "x": 20,
-                "y": 20,
-                "width": 200,
-                "height": 120,
-                "children": [
-                    {
-                        "id": "inner",
-                        "x": 15,
-                        "y": 10,
-                        "width": 40,
-                        "height": 25,
-                        "ports": [
-                            {
-                                "id": "inner-p",
-                                "x": 36,
-                                "y": 10,
-                                "width": 4,
-                                "height": 4,
-                            }
-                        ],
-                    }
-                ],
-                "ports": [],
-            }
-        ],
-        "edges": [],
-    }
+    return deep_copy(_NESTED_GRAPH_TEMPLATE)
+
+
+# The graph fixtures are requested hundreds of times across the suite.
+# Build each literal once at import and hand every caller a fresh clone,
+# so tests stay free to mutate their copy.
+_MINIMAL_GRAPH_TEMPLATE = {
+    "id": "root",
+    "width": 10,
+    "height": 10,
+    "children": [],
+    "edges": [],
+}
+
+
+_BASE_GRAPH_TEMPLATE = {
+    "id": "root",
+    "width": 220,
+    "height": 140,
+    "children": [
+        {
+            "id": "n1",
+            "x": 10,
+            "y": 20,
+            "width": 50,
+            "height": 30,
+            "type": "router",
+            "labels": [
+                {
+                    "id": "nl1",
+                    "text": "Node 1",
+                    "x": 10,
+                    "y": 8,
+                    "width": 30,
+                    "height": 12,
+                }
+            ],
+            "ports": [
+                {
+                    "id": "n1p_w",
+                    "x": 0,
+                    "y": 12,
+                    "width": 4,
+                    "height": 4,
+                    "labels": [
+                        {
+                            "id": "pl_w",
+                            "text": "west",
+                            "x": -14,
+                            "y": 0,
+                            "width": 12,
+                            "height": 4,
+                        }
+                    ],
+                },
+                {
+                    "id": "n1p_e",
+                    "x": 46,
+                    "y": 12,
+                    "width": 4,
+                    "height": 4,
+                    "labels": [
+                        {
+                            "id": "pl_e",
+                            "text": "east",
+                            "x": 6,
+                            "y": 0,
+                            "width": 12,
+                            "height": 4,
+                        }
+                    ],
+                },
+            ],
+        },
+        {
+            "id": "n2",
+            "x": 140,
+            "y": 20,
+            "width": 50,
+            "height": 30,
+            "labels": [],
+            "ports": [
+                {
+                    "id": "n2p_w",
+                    "x": 0,
+                    "y": 12,
+                    "width": 4,
+                    "height": 4,
+                }
+            ],
+        },
+    ],
+    "edges": [
+        {
+            "id": "e1",
+            "sources": ["n1p_e"],
+            "targets": ["n2p_w"],
+            "layoutOptions": {
+                "org.eclipse.elk.edge.type": "DEPENDENCY",
+                "org.eclipse.elk.edge.thickness": "2",
+            },
+            "sections": [
+                {
+                    "id": "s1",
+                    "startPoint": {"x": 60, "y": 34},
+                    "bendPoints": [{"x": 100, "y": 34}],
+                    "endPoint": {"x": 140, "y": 34},
+                }
+            ],
+            "junctionPoints": [{"x": 100, "y": 34}],
+            "labels": [
+                {
+                    "id": "el1",
+                    "text": "edge-1",
+                    "x": 95,
+                    "y": 28,
+                    "width": 20,
+                    "height": 8,
+                }
+            ],
+        }
+    ],
+}
+
+
+_NESTED_GRAPH_TEMPLATE = {
+    "id": "root",
+    "width": 300,
+    "height": 180,
+    "children": [
+        {
+            "id": "cluster",
+            "x": 20,
+            "y": 20,
+            "width": 200,
+            "height": 120,
+            "children": [
+                {
+                    "id": "inner",
+                    "x": 15,
+                    "y": 10,
+                    "width": 40,
+                    "height": 25,
+                    "ports": [
+                        {
+                            "id": "inner-p",
+                            "x": 36,
+                            "y": 10,
+                            "width": 4,
+                            "height": 4,
+                        }
+                    ],
+                }
+            ],
+            "ports": [],
+        }
+    ],
+    "edges": [],
+}
 
 
 def deep_copy(data: dict) -> dict:
-    return copy.deepcopy(data)
+    # Fixtures are plain JSON trees; a serialize/parse round-trip clones
+    # them much faster than copy.deepcopy's per-object dispatch.
+    return json.loads(json.dumps(data))
 
 
 def parse_svg(svg_text: str) -> ET.Element:
     return ET.fromstring(svg_text)
 
 
+# Serializing the renderer dominates SVG-test time, and many tests render
+# the identical graph with identical kwargs just to assert on disjoint
+# subtrees. Cache the rendered string per (graph, kwargs); callers that
+# mutate their graph simply miss the cache and render normally.
+@lru_cache(maxsize=32)
+def _cached_svg(graph_json: str, kwargs_items: tuple) -> str:
+    return GraphRender(json.loads(graph_json), **dict(kwargs_items)).to_string()
+
+
+def render_svg(graph: dict | None = None, **kwargs) -> str:
+    source = _BASE_GRAPH_TEMPLATE if graph is None else graph
+    return _cached_svg(json.dumps(source, sort_keys=True), tuple(sorted(kwargs.items())))
+
+
+def render_svg_root(graph: dict | None = None, **kwargs) -> ET.Element:
+    return parse_svg(render_svg(graph, **kwargs))
+
+
 def local_name(tag: str) -> str:
-    return tag.rsplit("}", 1)[-1] if "}" in tag else tag
+    # rpartition returns ("", "", tag) for unqualified tags, so the same
+    # expression handles both cases without scanning the string twice.
+    return tag.rpartition("}")[2]
 
 
 def root_children_signature(root: ET.Element) -> list[tuple[str, str | None]]:
@@ -185,6 +222,4 @@ def root_children_signature(root: ET.Element) -> list[tuple[str, str | None]]:
 
 
 def write_json(path: Path, data: dict) -> None:
-    import json
-
     path.write_text(json.dumps(data), encoding="utf-8")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -12,9 +12,11 @@ import main as cli_main
 class DummyRenderer:
     def __init__(self) -> None:
         self.writes: list[Path] = []
+        self.write_kwargs: list[dict] = []
 
-    def write(self, path: Path) -> None:
+    def write(self, path: Path, **kwargs) -> None:
         self.writes.append(Path(path))
+        self.write_kwargs.append(kwargs)
 
 
 class StubGraphRender:
@@ -32,10 +34,37 @@ class StubGraphRender:
         return cls.renderer
 
 
+@pytest.fixture
+def no_libsass(monkeypatch):
+    # _compile_scss_uncached prefers the in-process libsass binding; the
+    # CLI-path tests must exercise the subprocess fallback even when the
+    # scss extra is installed. A None entry makes `import sass` raise.
+    monkeypatch.setitem(sys.modules, "sass", None)
+
+
+@pytest.fixture
+def stub_graph_render(monkeypatch):
+    # One place wires the stub in and resets its recorded calls; the main()
+    # tests just take the fixture instead of repeating the monkeypatching.
+    StubGraphRender.reset()
+    monkeypatch.setattr(cli_main, "GraphRender", StubGraphRender)
+    return StubGraphRender
+
+
 def write_input(path: Path) -> None:
     path.write_text(json.dumps({"id": "root", "children": [], "edges": []}), encoding="utf-8")
 
 
+class FakeSassProcess:
+    def __init__(self, returncode: int, stdout: bytes = b"", stderr: bytes = b"") -> None:
+        self.returncode = returncode
+        self._stdout = stdout
+        self._stderr = stderr
+
+    def communicate(self) -> tuple[bytes, bytes]:
+        return self._stdout, self._stderr
+
+
 def test_load_theme_css_reads_css_file(tmp_path):
     css_path = tmp_path / "theme.css"
     css_path.write_text("svg { color: red; }", encoding="utf-8")
@@ -53,46 +82,193 @@ def test_load_theme_css_rejects_unsupported_extension(tmp_path):
         cli_main.load_theme_css(txt_path)
 
 
-def test_load_theme_css_raises_if_sass_binary_missing(monkeypatch, tmp_path):
+def test_load_theme_css_raises_if_sass_binary_missing(no_libsass, monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", "")
     scss_path = tmp_path / "theme.scss"
     scss_path.write_text("$c: red;", encoding="utf-8")
 
     def raising(*args, **kwargs):
         raise FileNotFoundError("sass missing")
 
-    monkeypatch.setattr(cli_main.subprocess, "run", raising)
+    monkeypatch.setattr(cli_main.subprocess, "Popen", raising)
 
     with pytest.raises(RuntimeError, match="requires the `sass` CLI"):
         cli_main.load_theme_css(scss_path)
 
 
-def test_load_theme_css_raises_on_sass_failure(monkeypatch, tmp_path):
+@pytest.mark.parametrize(
+    "returncode,stdout,stderr,expected",
+    [
+        pytest.param(0, b"svg{color:red;}\n", b"", "svg{color:red;}\n", id="success"),
+        pytest.param(2, b"", b"compile failed", RuntimeError, id="failure"),
+    ],
+)
+def test_load_theme_css_sass_cli_outcomes(no_libsass, monkeypatch, tmp_path, returncode, stdout, stderr, expected):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", "")
     scss_path = tmp_path / "theme.scss"
     scss_path.write_text("$c: red;", encoding="utf-8")
 
     monkeypatch.setattr(
         cli_main.subprocess,
-        "run",
-        lambda *args, **kwargs: subprocess.CompletedProcess(args=["sass"], returncode=2, stdout="", stderr="compile failed"),
+        "Popen",
+        lambda *args, **kwargs: FakeSassProcess(
+            returncode=returncode, stdout=stdout, stderr=stderr
+        ),
+    )
+
+    if expected is RuntimeError:
+        with pytest.raises(RuntimeError, match="sass compilation failed"):
+            cli_main.load_theme_css(scss_path)
+    else:
+        assert cli_main.load_theme_css(scss_path) == expected
+
+
+def test_load_theme_css_prefers_in_process_libsass(monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", str(tmp_path / "cache"))
+    scss_path = tmp_path / "theme.scss"
+    scss_path.write_text("$c: red;\nsvg { color: $c; }", encoding="utf-8")
+
+    calls: list[dict] = []
+
+    class FakeSassModule:
+        class CompileError(Exception):
+            pass
+
+        @staticmethod
+        def compile(**kwargs):
+            calls.append(kwargs)
+            return "svg{color:red}"
+
+    monkeypatch.setitem(sys.modules, "sass", FakeSassModule())
+    monkeypatch.setattr(
+        cli_main.subprocess,
+        "Popen",
+        lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("subprocess should not be used")),
     )
 
+    result = cli_main.load_theme_css(scss_path)
+
+    assert result == "svg{color:red}"
+    assert calls[0]["filename"] == str(scss_path)
+    assert calls[0]["include_paths"] == [str(tmp_path)]
+
+
+def test_load_theme_css_wraps_libsass_compile_error(monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", "")
+    scss_path = tmp_path / "theme.scss"
+    scss_path.write_text("svg { color: ; }", encoding="utf-8")
+
+    class FakeSassModule:
+        class CompileError(Exception):
+            pass
+
+        @staticmethod
+        def compile(**kwargs):
+            raise FakeSassModule.CompileError("bad value")
+
+    monkeypatch.setitem(sys.modules, "sass", FakeSassModule())
+
     with pytest.raises(RuntimeError, match="sass compilation failed"):
         cli_main.load_theme_css(scss_path)
 
 
-def test_load_theme_css_returns_compiled_sass_output(monkeypatch, tmp_path):
+def test_compiled_theme_css_is_cached_on_disk(no_libsass, monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", str(tmp_path / "cache"))
+    scss_path = tmp_path / "theme.scss"
+    scss_path.write_text("$c: red;", encoding="utf-8")
+
+    calls = {"count": 0}
+
+    def fake_popen(*args, **kwargs):
+        calls["count"] += 1
+        return FakeSassProcess(returncode=0, stdout=b"svg{color:red;}\n")
+
+    monkeypatch.setattr(cli_main.subprocess, "Popen", fake_popen)
+
+    first = cli_main.load_theme_css(scss_path)
+    second = cli_main.load_theme_css(scss_path)
+
+    assert first == second == "svg{color:red;}\n"
+    assert calls["count"] == 1
+
+
+def test_theme_cache_miss_when_imported_partial_changes(no_libsass, monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", str(tmp_path / "cache"))
+    partial_path = tmp_path / "_colors.scss"
+    partial_path.write_text("$c: red;", encoding="utf-8")
+    scss_path = tmp_path / "theme.scss"
+    scss_path.write_text("@use 'colors';\nsvg { color: $c; }", encoding="utf-8")
+
+    calls = {"count": 0}
+
+    def fake_popen(*args, **kwargs):
+        calls["count"] += 1
+        return FakeSassProcess(returncode=0, stdout=b"svg{}\n")
+
+    monkeypatch.setattr(cli_main.subprocess, "Popen", fake_popen)
+
+    cli_main.load_theme_css(scss_path)
+    partial_path.write_text("$c: blue;", encoding="utf-8")
+    cli_main.load_theme_css(scss_path)
+
+    assert calls["count"] == 2
+
+
+def test_theme_cache_tracks_comma_imports_and_directory_index(no_libsass, monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "_colors.scss").write_text("$c: red;", encoding="utf-8")
+    mixins_dir = tmp_path / "mixins"
+    mixins_dir.mkdir()
+    index_path = mixins_dir / "_index.scss"
+    index_path.write_text("$pad: 1px;", encoding="utf-8")
+    scss_path = tmp_path / "theme.scss"
+    scss_path.write_text("@import 'colors', 'mixins';\nsvg { color: $c; }", encoding="utf-8")
+
+    calls = {"count": 0}
+
+    def fake_popen(*args, **kwargs):
+        calls["count"] += 1
+        return FakeSassProcess(returncode=0, stdout=b"svg{}\n")
+
+    monkeypatch.setattr(cli_main.subprocess, "Popen", fake_popen)
+
+    cli_main.load_theme_css(scss_path)
+    # The second comma-separated target resolves to mixins/_index.scss;
+    # touching it must invalidate the cached CSS.
+    index_path.write_text("$pad: 2px;", encoding="utf-8")
+    cli_main.load_theme_css(scss_path)
+
+    assert calls["count"] == 2
+
+
+def test_theme_manifest_mtime_fast_path_skips_hashing(no_libsass, monkeypatch, tmp_path):
+    monkeypatch.setenv("GRAPHRENDER_THEME_CACHE_DIR", str(tmp_path / "cache"))
     scss_path = tmp_path / "theme.scss"
     scss_path.write_text("$c: red;", encoding="utf-8")
 
     monkeypatch.setattr(
         cli_main.subprocess,
-        "run",
-        lambda *args, **kwargs: subprocess.CompletedProcess(args=["sass"], returncode=0, stdout="svg{color:red;}\n", stderr=""),
+        "Popen",
+        lambda *args, **kwargs: FakeSassProcess(returncode=0, stdout=b"svg{color:red;}\n"),
     )
 
-    result = cli_main.load_theme_css(scss_path)
+    first = cli_main.load_theme_css(scss_path)
+
+    # A fresh process would start with an empty memo; the manifest alone
+    # must satisfy the reload without re-reading or re-hashing contents.
+    cli_main._SCSS_MEMO.clear()
+    monkeypatch.setattr(
+        cli_main,
+        "_scss_dependencies",
+        lambda *args: (_ for _ in ()).throw(AssertionError("should not re-read theme contents")),
+    )
+    monkeypatch.setattr(
+        cli_main,
+        "_theme_cache_key",
+        lambda *args: (_ for _ in ()).throw(AssertionError("should not re-hash theme contents")),
+    )
 
-    assert result == "svg{color:red;}\n"
+    assert cli_main.load_theme_css(scss_path) == first
 
 
 def test_main_raises_when_input_is_missing(tmp_path):
@@ -102,75 +278,71 @@ def test_main_raises_when_input_is_missing(tmp_path):
         cli_main.main([str(missing)])
 
 
-def test_main_raises_when_theme_file_missing(monkeypatch, tmp_path):
+def test_main_raises_when_theme_file_missing(stub_graph_render, tmp_path):
     input_path = tmp_path / "graph.json"
     write_input(input_path)
-    monkeypatch.setattr(cli_main, "GraphRender", StubGraphRender)
-    StubGraphRender.reset()
 
     with pytest.raises(FileNotFoundError, match="Theme file not found"):
         cli_main.main([str(input_path), "--theme", str(tmp_path / "missing.css")])
 
 
-def test_main_uses_default_output_and_theme_settings(monkeypatch, tmp_path, capsys):
+def test_main_uses_default_output_and_theme_settings(stub_graph_render, tmp_path, capsys):
     input_path = tmp_path / "graph.json"
     write_input(input_path)
 
-    monkeypatch.setattr(cli_main, "GraphRender", StubGraphRender)
-    StubGraphRender.reset()
-
     cli_main.main([str(input_path)])
 
-    args, kwargs = StubGraphRender.calls[0]
+    args, kwargs = stub_graph_render.calls[0]
     assert Path(args[0]) == input_path
     assert kwargs == {"embed_theme": True, "theme_css": None}
-    assert StubGraphRender.renderer.writes == [tmp_path / "graph.svg"]
+    assert stub_graph_render.renderer.writes == [tmp_path / "graph.svg"]
     assert f"Rendered: {tmp_path / 'graph.svg'}" in capsys.readouterr().out
 
 
-def test_main_respects_no_theme_flag(monkeypatch, tmp_path):
+def test_main_compact_flag_disables_pretty_output(stub_graph_render, tmp_path):
     input_path = tmp_path / "graph.json"
     write_input(input_path)
 
-    monkeypatch.setattr(cli_main, "GraphRender", StubGraphRender)
-    StubGraphRender.reset()
+    cli_main.main([str(input_path), "--compact"])
+
+    assert stub_graph_render.renderer.write_kwargs == [{"pretty": False}]
+
+
+def test_main_respects_no_theme_flag(stub_graph_render, tmp_path):
+    input_path = tmp_path / "graph.json"
+    write_input(input_path)
 
     cli_main.main([str(input_path), "--no-theme"])
 
-    _, kwargs = StubGraphRender.calls[0]
+    _, kwargs = stub_graph_render.calls[0]
     assert kwargs["embed_theme"] is False
     assert kwargs["theme_css"] is None
 
 
-def test_main_loads_theme_css_and_passes_to_renderer(monkeypatch, tmp_path):
+def test_main_loads_theme_css_and_passes_to_renderer(stub_graph_render, tmp_path):
     input_path = tmp_path / "graph.json"
     theme_path = tmp_path / "theme.css"
     write_input(input_path)
     theme_path.write_text("svg{stroke:red;}", encoding="utf-8")
 
-    monkeypatch.setattr(cli_main, "GraphRender", StubGraphRender)
-    StubGraphRender.reset()
-
     cli_main.main([str(input_path), "--theme", str(theme_path)])
 
-    _, kwargs = StubGraphRender.calls[0]
+    _, kwargs = stub_graph_render.calls[0]
     assert kwargs["embed_theme"] is True
     assert kwargs["theme_css"] == "svg{stroke:red;}"
 
 
-def test_main_resolves_relative_paths_against_root(monkeypatch, tmp_path):
+def test_main_resolves_relative_paths_against_root(stub_graph_render, monkeypatch, tmp_path):
     input_path = tmp_path / "input.json"
     theme_path = tmp_path / "theme.css"
     write_input(input_path)
     theme_path.write_text("svg{fill:blue;}", encoding="utf-8")
 
     monkeypatch.setattr(cli_main, "ROOT", tmp_path)
-    monkeypatch.setattr(cli_main, "GraphRender", StubGraphRender)
-    StubGraphRender.reset()
 
     cli_main.main(["input.json", "--theme", "theme.css", "-o", "out/rendered.svg"])
 
-    args, kwargs = StubGraphRender.calls[0]
+    args, kwargs = stub_graph_render.calls[0]
     assert Path(args[0]) == input_path
     assert kwargs["theme_css"] == "svg{fill:blue;}"
-    assert StubGraphRender.renderer.writes == [tmp_path / "out" / "rendered.svg"]
+    assert stub_graph_render.renderer.writes == [tmp_path / "out" / "rendered.svg"]
@@ -4,17 +4,28 @@ import json
 
 import pytest
 
+import graphrender.graphrender as renderer_module
 from graphrender import GraphRender
 
-from .helpers import base_graph, deep_copy, graph_with_nested_node, minimal_graph, write_json
+from .helpers import base_graph, deep_copy, graph_with_nested_node, minimal_graph
+
+# Serialized once; the from_json and from_file tests feed the same payload
+# through both entry points instead of re-dumping the graph per call.
+_BASE_GRAPH_JSON = json.dumps(base_graph())
+
+
+@pytest.fixture(scope="module")
+def minimal_renderer() -> GraphRender:
+    # Shared by tests that only call read-only option/style helpers; tests
+    # that mutate renderer state construct their own instance.
+    return GraphRender(minimal_graph(), embed_theme=False)
 
 
 def test_from_json_and_from_file_collect_expected_items(tmp_path):
-    graph = base_graph()
     json_path = tmp_path / "graph.json"
-    write_json(json_path, graph)
+    json_path.write_text(_BASE_GRAPH_JSON, encoding="utf-8")
 
-    from_json = GraphRender.from_json(json.dumps(graph), embed_theme=False)
+    from_json = GraphRender.from_json(_BASE_GRAPH_JSON, embed_theme=False)
     from_file = GraphRender.from_file(json_path, embed_theme=False)
 
     assert len(from_json.nodes) == len(from_file.nodes) == 2
@@ -22,6 +33,15 @@ def test_from_json_and_from_file_collect_expected_items(tmp_path):
     assert len(from_json.labels) == len(from_file.labels) == 4
 
 
+def test_from_file_strips_utf8_bom(tmp_path):
+    json_path = tmp_path / "graph.json"
+    json_path.write_bytes(b"\xef\xbb\xbf" + _BASE_GRAPH_JSON.encode("utf-8"))
+
+    renderer = GraphRender.from_file(json_path, embed_theme=False)
+
+    assert len(renderer.nodes) == 2
+
+
 def test_collect_graph_resolves_nested_absolute_coordinates():
     renderer = GraphRender(graph_with_nested_node(), embed_theme=False)
 
@@ -34,18 +54,17 @@ def test_collect_graph_resolves_nested_absolute_coordinates():
     assert port["y"] == 40
 
 
-def test_option_value_prefers_layout_options_over_properties():
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
+def test_option_value_prefers_layout_options_over_properties(minimal_renderer):
     item = {
         "layoutOptions": {"key": "layout"},
         "properties": {"key": "properties"},
     }
 
-    assert renderer._option_value(item, "key") == "layout"
+    assert minimal_renderer._option_value(item, "key") == "layout"
 
 
-def test_font_size_parses_and_rejects_invalid_values():
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
+def test_font_size_parses_and_rejects_invalid_values(minimal_renderer):
+    renderer = minimal_renderer
 
     assert renderer._font_size({"layoutOptions": {"org.eclipse.elk.font.size": "10.5"}}) == 10.5
     assert renderer._font_size({"properties": {"org.eclipse.elk.font.size": "11"}}) == 11.0
@@ -55,7 +74,7 @@ def test_font_size_parses_and_rejects_invalid_values():
 def test_partition_labels_groups_explicit_owner_kinds():
     renderer = GraphRender(base_graph(), embed_theme=False)
 
-    grouped = renderer._partition_labels()
+    grouped, owners_with_text = renderer._partition_labels()
 
     assert "n1" in grouped["node"]
     assert "n1p_w" in grouped["port"]
@@ -67,20 +86,24 @@ def test_partition_labels_prefers_edge_when_owner_id_overlaps():
     renderer.node_lookup["shared"] = {"id": "shared"}
     renderer.port_lookup["shared"] = {"id": "shared", "side": "WEST", "x": 0, "y": 0, "width": 1, "height": 1}
     renderer.edges = [{"edge": {"id": "shared"}, "offset": (0, 0)}]
+    renderer._owner_kind = renderer._build_owner_kind_index()
     renderer.labels = [
-        {
-            "owner": "shared",
-            "text": "ambiguous",
-            "x": 1,
-            "y": 1,
-            "width": 0,
-            "height": 0,
-        }
+        renderer_module._Label(
+            owner_kind="",
+            owner="shared",
+            id=None,
+            text="ambiguous",
+            x=1,
+            y=1,
+            width=0,
+            height=0,
+            font_size=None,
+        )
     ]
 
-    grouped = renderer._partition_labels()
+    grouped, owners_with_text = renderer._partition_labels()
 
-    assert grouped["edge"]["shared"][0]["text"] == "ambiguous"
+    assert grouped["edge"]["shared"][0].text == "ambiguous"
     assert "shared" not in grouped["node"]
     assert "shared" not in grouped["port"]
 
@@ -99,11 +122,17 @@ def test_label_to_text_uses_port_baseline_for_relative_position():
     renderer = GraphRender(base_graph(), embed_theme=False)
 
     above = renderer._label_to_text(
-        {"owner": "n1p_w", "text": "A", "x": 0, "y": 25, "width": 0, "height": 0},
+        renderer_module._Label(
+            owner_kind="port", owner="n1p_w", id=None, text="A",
+            x=0, y=25, width=0, height=0, font_size=None,
+        ),
         owner_kind="port",
     )
     below = renderer._label_to_text(
-        {"owner": "n1p_w", "text": "B", "x": 0, "y": 40, "width": 0, "height": 0},
+        renderer_module._Label(
+            owner_kind="port", owner="n1p_w", id=None, text="B",
+            x=0, y=40, width=0, height=0, font_size=None,
+        ),
         owner_kind="port",
     )
 
@@ -111,8 +140,8 @@ def test_label_to_text_uses_port_baseline_for_relative_position():
     assert below.dominant_baseline == "text-after-edge"
 
 
-def test_edge_thickness_normalizes_non_positive_and_invalid_values():
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
+def test_edge_thickness_normalizes_non_positive_and_invalid_values(minimal_renderer):
+    renderer = minimal_renderer
 
     assert renderer._edge_thickness({"layoutOptions": {"org.eclipse.elk.edge.thickness": "0"}}) == 1.0
     assert renderer._edge_thickness({"layoutOptions": {"org.eclipse.elk.edge.thickness": -5}}) == 1.0
@@ -131,14 +160,13 @@ def test_edge_thickness_normalizes_non_positive_and_invalid_values():
         ("GENERALIZATION", "url(#triangle-hollow)", None),
     ],
 )
-def test_edge_rendering_maps_type_to_markers(edge_type, expected_end, expected_dash):
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
+def test_edge_rendering_maps_type_to_markers(minimal_renderer, edge_type, expected_end, expected_dash):
     edge = {"layoutOptions": {"org.eclipse.elk.edge.type": edge_type}}
 
-    render = renderer._edge_rendering(edge)
+    render = minimal_renderer._edge_rendering(edge)
 
-    assert render["marker_end"] == expected_end
-    assert render["stroke_dasharray"] == expected_dash
+    assert render.marker_end == expected_end
+    assert render.stroke_dasharray == expected_dash
 
 
 def test_fallback_section_uses_source_and_target_port_centers():
@@ -194,7 +222,7 @@ def test_port_label_without_coordinates_defaults_to_port_center():
     }
     renderer = GraphRender(graph, embed_theme=False)
 
-    port_label = next(lbl for lbl in renderer.labels if lbl["owner"] == "port")
+    port_label = next(lbl for lbl in renderer.labels if lbl.owner == "port")
 
-    assert port_label["x"] == 38.0
-    assert port_label["y"] == 20.0
+    assert port_label.x == 38.0
+    assert port_label.y == 20.0
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
-import re
+import io
+import xml.etree.ElementTree as ET
 
 from graphrender import GraphRender
 
-from .helpers import SVG_NS, base_graph, deep_copy, local_name, parse_svg, root_children_signature
+from .helpers import (
+    SVG_NS,
+    base_graph,
+    deep_copy,
+    local_name,
+    parse_svg,
+    render_svg,
+    render_svg_root,
+    root_children_signature,
+)
 
 
 def test_root_structure_orders_edges_before_nodes():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-
-    root = parse_svg(renderer.to_string())
+    root = render_svg_root(embed_theme=False)
     children = root_children_signature(root)
 
     assert children[0] == ("rect", "root")
@@ -37,6 +45,48 @@ def test_pretty_output_indents_style_on_new_lines():
     assert "\n  </style>" in svg_text
 
 
+def test_raw_and_object_shape_modes_are_equivalent():
+    raw = GraphRender(base_graph(), embed_theme=False).to_string(pretty=False)
+    tree = GraphRender(
+        base_graph(), embed_theme=False, emit_raw_shapes=False
+    ).to_string(pretty=False)
+
+    assert ET.canonicalize(raw) == ET.canonicalize(tree)
+
+
+def test_group_edges_disabled_batches_sections_into_shared_paths():
+    root = render_svg_root(embed_theme=False, group_edges=False)
+
+    edges_group = root.find(".//svg:g[@id='edges']", SVG_NS)
+    assert edges_group is not None
+
+    paths = edges_group.findall("./svg:path", SVG_NS)
+    stroke_paths = [p for p in paths if p.get("fill") == "none"]
+    dot_paths = [p for p in paths if p.get("fill") == "#444"]
+
+    assert len(stroke_paths) == 1
+    assert stroke_paths[0].get("d").startswith("M 60.00 34.00")
+    assert stroke_paths[0].get("stroke-dasharray") == "6 3"
+    assert len(dot_paths) == 1
+
+    edge_group = edges_group.find("./svg:g[@id='e1']", SVG_NS)
+    assert edge_group is not None
+    assert edge_group.find("./svg:polyline", SVG_NS) is None
+    assert edge_group.find("./svg:circle", SVG_NS) is None
+    assert edge_group.findall(".//svg:text", SVG_NS)
+
+
+def test_render_to_stream_matches_compact_string():
+    renderer = GraphRender(base_graph(), embed_theme=False)
+
+    buf = io.StringIO()
+    renderer.render_to(buf)
+
+    assert ET.canonicalize(buf.getvalue()) == ET.canonicalize(
+        renderer.to_string(pretty=False)
+    )
+
+
 def test_to_string_non_pretty_keeps_compact_output():
     renderer = GraphRender(base_graph(), embed_theme=False)
 
@@ -94,9 +144,19 @@ def test_port_label_background_rect_requires_positive_dimensions():
     assert background_rects[0].get("id") == "root"
 
 
-def test_edges_group_contains_bend_and_junction_markers():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
+def test_edges_group_contains_junction_marker_but_hides_bend_circles():
+    root = render_svg_root(embed_theme=False)
+
+    edge_group = root.find(".//svg:g[@id='e1']", SVG_NS)
+    assert edge_group is not None
+
+    circles = [el for el in list(edge_group) if local_name(el.tag) == "circle"]
+
+    assert len(circles) == 1
+
+
+def test_show_bend_points_adds_debug_circles():
+    root = render_svg_root(embed_theme=False, show_bend_points=True)
 
     edge_group = root.find(".//svg:g[@id='e1']", SVG_NS)
     assert edge_group is not None
@@ -107,8 +167,7 @@ def test_edges_group_contains_bend_and_junction_markers():
 
 
 def test_edge_labels_render_background_and_text():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
+    root = render_svg_root(embed_theme=False)
 
     edge_label_rects = root.findall(
         ".//svg:g[@id='e1']//svg:g[@class='labels']//svg:rect[@class='background']",
@@ -148,7 +207,7 @@ def test_fallback_section_renders_polyline_when_sections_missing():
     polyline = root.find(".//svg:g[@id='e1']/svg:polyline", SVG_NS)
 
     assert polyline is not None
-    assert polyline.get("points") == "58.0 34.0 142.0 34.0"
+    assert polyline.get("points") == "58.00 34.00 142.00 34.00"
 
 
 def test_icon_defs_and_use_render_with_mocked_fetch(monkeypatch):
@@ -178,16 +237,14 @@ def test_icon_defs_and_use_render_with_mocked_fetch(monkeypatch):
 
 
 def test_canvas_dimensions_follow_padding_and_dimensions():
-    renderer = GraphRender(base_graph(), embed_theme=False, padding=5)
-    root = parse_svg(renderer.to_string())
+    svg_text = render_svg(embed_theme=False, padding=5)
 
-    assert root.get("width") == "230"
-    assert root.get("height") == "150"
+    assert 'width="230"' in svg_text
+    assert 'height="150"' in svg_text
 
 
 def test_edge_dependency_type_sets_dasharray_and_marker():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
+    root = render_svg_root(embed_theme=False)
 
     polyline = root.find(".//svg:g[@id='e1']/svg:polyline", SVG_NS)
 
@@ -197,8 +254,7 @@ def test_edge_dependency_type_sets_dasharray_and_marker():
 
 
 def test_dependency_marker_is_smaller_and_solid():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
+    root = render_svg_root(embed_theme=False)
 
     marker = root.find(".//svg:marker[@id='arrow-open-dependency']", SVG_NS)
 
@@ -218,8 +274,7 @@ def test_dependency_marker_is_smaller_and_solid():
 
 
 def test_filled_arrow_marker_tip_is_anchored_at_edge_endpoint():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
+    root = render_svg_root(embed_theme=False)
 
     marker = root.find(".//svg:marker[@id='arrow']", SVG_NS)
 
@@ -229,8 +284,7 @@ def test_filled_arrow_marker_tip_is_anchored_at_edge_endpoint():
 
 
 def test_triangle_hollow_marker_uses_current_color_and_no_fill():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
+    root = render_svg_root(embed_theme=False)
 
     marker = root.find(".//svg:marker[@id='triangle-hollow']", SVG_NS)
 
@@ -243,18 +297,13 @@ def test_triangle_hollow_marker_uses_current_color_and_no_fill():
     assert marker_path.get("fill") == "none"
 
 
+# Substring checks on the rendered string; these assertions need no DOM.
 def test_style_element_absent_when_embed_theme_disabled():
-    renderer = GraphRender(base_graph(), embed_theme=False)
-    root = parse_svg(renderer.to_string())
-
-    assert root.find("./svg:style", SVG_NS) is None
+    assert "<style" not in render_svg(embed_theme=False)
 
 
 def test_style_element_present_when_embed_theme_enabled_with_custom_css():
-    renderer = GraphRender(base_graph(), embed_theme=True, theme_css="svg{color:red;}")
-    root = parse_svg(renderer.to_string())
-
-    style = root.find("./svg:style", SVG_NS)
+    svg_text = render_svg(embed_theme=True, theme_css="svg{color:red;}")
 
-    assert style is not None
-    assert re.search(r"svg\{color:red;\}", style.text or "")
+    assert "<style" in svg_text
+    assert "svg{color:red;}" in svg_text
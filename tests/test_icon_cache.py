@@ -41,35 +41,29 @@ def test_resolve_cache_dir_empty_env_disables_disk_cache(monkeypatch):
     assert renderer._icon_cache_path("mdi:router") is None
 
 
-def test_resolve_cache_dir_prefers_xdg(monkeypatch, tmp_path):
-    monkeypatch.delenv("GRAPHRENDER_ICON_CACHE_DIR", raising=False)
-    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
-    monkeypatch.delenv("LOCALAPPDATA", raising=False)
+# The precedence variants below exercise _resolve_icon_cache_dir as a pure
+# function of an injected env mapping; constructing a renderer per
+# environment permutation adds nothing to what the two tests above cover.
+def _resolve(env: dict) -> Path | None:
+    return GraphRender._resolve_icon_cache_dir(env)
 
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
-
-    assert renderer._icon_cache_dir == tmp_path / "xdg" / "graphrender" / "icons"
 
+def test_resolve_cache_dir_prefers_xdg(tmp_path):
+    resolved = _resolve({"XDG_CACHE_HOME": str(tmp_path / "xdg")})
 
-def test_resolve_cache_dir_uses_localappdata_when_xdg_missing(monkeypatch, tmp_path):
-    monkeypatch.delenv("GRAPHRENDER_ICON_CACHE_DIR", raising=False)
-    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
-    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "localapp"))
+    assert resolved == tmp_path / "xdg" / "graphrender" / "icons"
 
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
 
-    assert renderer._icon_cache_dir == tmp_path / "localapp" / "graphrender" / "icons"
+def test_resolve_cache_dir_uses_localappdata_when_xdg_missing(tmp_path):
+    resolved = _resolve({"LOCALAPPDATA": str(tmp_path / "localapp")})
 
+    assert resolved == tmp_path / "localapp" / "graphrender" / "icons"
 
-def test_resolve_cache_dir_falls_back_to_home(monkeypatch, tmp_path):
-    monkeypatch.delenv("GRAPHRENDER_ICON_CACHE_DIR", raising=False)
-    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
-    monkeypatch.delenv("LOCALAPPDATA", raising=False)
-    monkeypatch.setenv("HOME", str(tmp_path / "home"))
 
-    renderer = GraphRender(minimal_graph(), embed_theme=False)
+def test_resolve_cache_dir_falls_back_to_home(tmp_path):
+    resolved = _resolve({"HOME": str(tmp_path / "home")})
 
-    assert renderer._icon_cache_dir == Path(tmp_path / "home" / ".cache" / "graphrender" / "icons")
+    assert resolved == Path(tmp_path / "home" / ".cache" / "graphrender" / "icons")
 
 
 def test_icon_cache_path_sanitizes_icon_name(monkeypatch, tmp_path):
@@ -160,7 +154,7 @@ def test_icon_geometry_parses_viewbox_and_caches(monkeypatch):
     first = renderer._icon_geometry("mdi:router")
     second = renderer._icon_geometry("mdi:router")
 
-    assert first == ("<path d=\"M0 0h24v12H0z\" />", 24.0, 12.0)
+    assert first == ("<path d='M0 0h24v12H0z'/>", 24.0, 12.0)
     assert second == first
     assert calls["count"] == 1
 
@@ -175,7 +169,7 @@ def test_icon_geometry_falls_back_to_width_height(monkeypatch):
 
     geom = renderer._icon_geometry("mdi:router")
 
-    assert geom == ("<path d=\"M0 0h16v8H0z\" />", 16.0, 8.0)
+    assert geom == ("<path d='M0 0h16v8H0z'/>", 16.0, 8.0)
 
 
 def test_icon_geometry_rejects_invalid_dimensions(monkeypatch):
@@ -210,6 +204,45 @@ def test_build_icon_defs_deduplicates_identical_icons(monkeypatch):
     assert renderer._icon_def_id("mdi:router") == "icon-mdi-router"
 
 
+def _two_icon_graph() -> dict:
+    return {
+        "id": "root",
+        "width": 80,
+        "height": 60,
+        "children": [
+            {"id": "n1", "x": 10, "y": 10, "width": 24, "height": 24, "icon": "mdi:router"},
+            {"id": "n2", "x": 40, "y": 10, "width": 24, "height": 24, "icon": "mdi:switch"},
+        ],
+        "edges": [],
+    }
+
+
+def test_icon_prefetch_warms_cache_at_construction(monkeypatch):
+    fetched: list[str] = []
+    monkeypatch.setattr(
+        GraphRender,
+        "_fetch_icon_svg",
+        lambda self, name: fetched.append(name) or "<svg viewBox='0 0 1 1'><path d=''/></svg>",
+    )
+
+    GraphRender(_two_icon_graph(), embed_theme=False)
+
+    assert sorted(fetched) == ["mdi:router", "mdi:switch"]
+
+
+def test_icon_prefetch_can_be_disabled(monkeypatch):
+    fetched: list[str] = []
+    monkeypatch.setattr(
+        GraphRender,
+        "_fetch_icon_svg",
+        lambda self, name: fetched.append(name) or None,
+    )
+
+    GraphRender(_two_icon_graph(), embed_theme=False, enable_icon_prefetch=False)
+
+    assert fetched == []
+
+
 def test_fetch_icon_svg_rejects_invalid_icon_names_without_network(monkeypatch):
     monkeypatch.setattr(
         renderer_module,